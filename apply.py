@@ -1,66 +1,62 @@
 # apply.py
 
-import asyncio
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
-import pymongo
-from config import USER_DETAILS, MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME
-from utils import human_type, safe_fill, upload_resume, wait_random
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+from config import USER_DETAILS, BREAKERS
+from browser_pool import get_pool
+import metrics
+from persistence import get_writer
+from form_flow import get_engine, SUBMITTED, NO_START
+from resilience import CircuitBreaker, describe_error
 
-async def apply_to_job(job):
-    print(f"🚀 Applying to: {job['title']} in {job['location']}")
+# Opens when application pages keep failing to load, instead of burning a context per job
+_breaker = CircuitBreaker("apply", **BREAKERS["apply"])
 
-    client = pymongo.MongoClient(MONGO_URI)
-    db = client[MONGO_DB_NAME]
-    collection = db[MONGO_COLLECTION_NAME]
+# Returned instead of trying while the breaker is open: the job was not attempted
+BREAKER_OPEN = "breaker_open"
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)  # Set to False to see the browser
-        page = await browser.new_page()
 
-        try:
-            await page.goto(job["link"], timeout=30000)
-            await page.wait_for_load_state("networkidle")
-            await wait_random()
+def retry_after():
+    """Seconds until the apply breaker lets applications through again."""
+    return _breaker.retry_in()
 
-            # Check if "Apply Now" or similar button exists
-            apply_button = await page.query_selector("text='Apply Now'") or await page.query_selector("text='Start application'")
-            if apply_button:
-                await apply_button.click()
-                await page.wait_for_timeout(2000)
 
-                # Fill out application fields (example only)
-                await safe_fill(page, 'input[name="email"]', USER_DETAILS["email"])
-                await wait_random()
-                await safe_fill(page, 'input[name="phone"]', USER_DETAILS["phone"])
-                await wait_random()
+async def apply_to_job(job, pool=None):
+    """Returns the form_flow status (SUBMITTED, NO_START, NO_SUBMIT), BREAKER_OPEN, or None if the attempt errored."""
+    print(f"🚀 Applying to: {job.title} in {job.location}")
 
-                # Upload resume
-                await upload_resume(page, "resume.pdf")
-                await wait_random()
+    if not _breaker.allow():
+        print(f"🔌 Deferring application: apply breaker {_breaker.describe()}")
+        return BREAKER_OPEN
 
-                # Submit form
-                submit_button = await page.query_selector("text='Submit Application'") or await page.query_selector("text='Continue'")
-                if submit_button:
-                    await submit_button.click()
-                    await page.wait_for_timeout(2000)
-                    print(f"✅ Application submitted for: {job['title']}")
-                else:
-                    print("⚠️ No Submit button found.")
+    pool = pool or await get_pool()
 
-                # Save application to MongoDB
-                collection.insert_one({
-                    "user_email": USER_DETAILS["email"],
-                    "job_id": job.get("job_id") or job["link"],
-                    "title": job["title"],
-                    "location": job["location"],
-                    "applied_at": job.get("timestamp") or "now"
-                })
-            else:
+    async with pool.lease("apply") as context:
+        page = await context.new_page()
+
+        try:
+            # Learned once per posting template, replayed from cache after that
+            status = await get_engine().run(page, job.link)
+            _breaker.record_success()
+
+            if status == NO_START:
                 print("❌ No 'Apply Now' button found on page.")
+                return status
+
+            if status == SUBMITTED:
+                metrics.inc("applications_submitted")
+                print(f"✅ Application submitted for: {job.title}")
+            else:
+                print("⚠️ No Submit button found.")
+
+            # Journal locally; the write-behind task batches it into MongoDB
+            get_writer().record(job.to_record(USER_DETAILS["email"]))
+            return status
 
-        except PlaywrightTimeout:
+        except PlaywrightTimeout as e:
+            _breaker.record_failure(describe_error(e))
             print("⏱️ Timeout while loading the page.")
         except Exception as e:
+            _breaker.record_failure(describe_error(e))
             print(f"🔥 Unexpected error during application: {e}")
         finally:
-            await browser.close()
+            await page.close()
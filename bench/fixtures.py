@@ -0,0 +1,80 @@
+# bench/fixtures.py
+# Synthetic but shape-accurate job data: GraphQL cards plus the HTML pages built from them.
+
+import html
+import random
+
+CITIES = ["Cambridge", "Hamilton", "Brampton", "Mississauga", "London", "St Thomas",
+          "Toronto", "Ottawa", "Windsor", "Kitchener", "Barrie", "Whitby"]
+TITLES = ["Warehouse Associate", "Fulfillment Center Associate", "Sortation Associate",
+          "Delivery Station Associate", "Amazon Fresh Associate"]
+
+
+def make_cards(count, seed=1):
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        pay = rng.choice([17.5, 18.1, 19.0, 19.9, 21.4])
+        cards.append({
+            "jobId": f"JOB-CA-{i:07d}",
+            "jobTitle": rng.choice(TITLES),
+            "locationName": f"{rng.choice(CITIES)}, ON",
+            "scheduleCount": rng.randint(0, 12),
+            "employmentTypeL10N": rng.choice(["Full Time", "Part Time", "Flex Time"]),
+            "totalPayRateMinL10N": f"${pay:.2f}",
+            "totalPayRateMaxL10N": f"${pay + 2:.2f}",
+        })
+    return cards
+
+
+def graphql_page(cards, offset, page_size):
+    return {"data": {"searchJobCardsByLocation": {"jobCards": cards[offset:offset + page_size]}}}
+
+
+def amazon_jobs_search_html(cards):
+    # Tile markup job_checker.TILE_SCHEMA reads
+    tiles = "".join(
+        f'<div class="job-tile"><h3>{html.escape(c["jobTitle"])}</h3>'
+        f'<p class="location-and-id">{html.escape(c["locationName"])} | {c["jobId"]}</p>'
+        f'<a href="/en/jobs/{c["jobId"]}">View</a></div>'
+        for c in cards
+    )
+    return f"<!doctype html><html><body><div id='results'>{tiles}</div></body></html>"
+
+
+def hiring_search_html(graphql_url):
+    # Like the real page: empty shell that fills itself from searchJobCardsByLocation
+    return f"""<!doctype html><html><body><div id="results"></div>
+<script>
+fetch({graphql_url!r}, {{
+    method: "POST",
+    headers: {{"Content-Type": "application/json"}},
+    body: JSON.stringify({{
+        operationName: "searchJobCardsByLocation",
+        query: "query searchJobCardsByLocation {{ jobCards }}",
+        variables: {{searchJobRequest: {{offset: 0, pageSize: 100}}}}
+    }})
+}}).then(r => r.json()).then(js => {{
+    const root = document.getElementById("results");
+    for (const c of js.data.searchJobCardsByLocation.jobCards) {{
+        const tile = document.createElement("div");
+        tile.className = "job-tile";
+        tile.innerHTML = `<span class="job-title">${{c.jobTitle}}</span>` +
+            `<span class="job-location">${{c.locationName}}</span>` +
+            `<a href="/apply/${{c.jobId}}">Apply</a>`;
+        root.appendChild(tile);
+    }}
+}});
+</script></body></html>"""
+
+
+def application_html(job_id):
+    # Apply Now reveals the form; submitting removes the button like a step change would
+    return f"""<!doctype html><html><body>
+<h1>{html.escape(job_id)}</h1>
+<button id="apply" onclick="document.getElementById('form').style.display='block'; this.remove();">Apply Now</button>
+<form id="form" style="display:none" onsubmit="return false;">
+  <input name="email"><input name="phone"><input type="file">
+  <button onclick="this.remove(); document.body.append('Thank you');">Submit Application</button>
+</form>
+</body></html>"""
@@ -0,0 +1,50 @@
+# bench/mongo_stub.py
+# In-memory stand-in for the slice of the pymongo Collection API the bot uses.
+
+
+class _InsertResult:
+    def __init__(self, ids):
+        self.inserted_ids = ids
+        self.inserted_id = ids[0] if ids else None
+
+
+class MemoryCollection:
+    def __init__(self):
+        self.docs = []
+        self._by_job_id = {}
+        self.round_trips = 0
+
+    def create_index(self, keys, **kwargs):
+        self.round_trips += 1
+        return kwargs.get("name", str(keys))
+
+    def _project(self, doc, projection):
+        if not projection:
+            return dict(doc)
+        return {k: doc[k] for k, keep in projection.items() if keep and k in doc}
+
+    def find(self, query=None, projection=None):
+        self.round_trips += 1
+        query = query or {}
+        cond = query.get("job_id")
+        if isinstance(cond, dict) and "$in" in cond:
+            docs = [self._by_job_id[j] for j in cond["$in"] if j in self._by_job_id]
+        elif cond is not None:
+            docs = [self._by_job_id[cond]] if cond in self._by_job_id else []
+        else:
+            docs = self.docs
+        return [self._project(d, projection) for d in docs]
+
+    def find_one(self, query=None, projection=None):
+        docs = self.find(query, projection)
+        return docs[0] if docs else None
+
+    def insert_one(self, doc):
+        return self.insert_many([doc])
+
+    def insert_many(self, docs, ordered=True):
+        self.round_trips += 1
+        for doc in docs:
+            self.docs.append(doc)
+            self._by_job_id[doc.get("job_id")] = doc
+        return _InsertResult([id(d) for d in docs])
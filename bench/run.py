@@ -0,0 +1,267 @@
+# bench/run.py
+"""Offline end-to-end benchmark: local GraphQL/HTML server, SMTP sink and in-memory Mongo.
+
+    python -m bench.run --sizes 10,100,1000,10000
+    python -m bench.run --json bench.json                       # save results
+    python -m bench.run --baseline bench.json --tolerance 0.2   # exit 1 on >20% regression
+
+Sections whose dependencies are missing (playwright, requests, pymongo, dotenv) are skipped.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from bench.server import FixtureServer
+from bench.smtp_sink import SMTPSink
+from bench.mongo_stub import MemoryCollection
+from bench.fixtures import make_cards, graphql_page
+
+# --- Point every module at the local stand-ins before any of them is imported ---
+server = FixtureServer().start()
+sink = SMTPSink().start()
+os.environ.update({
+    "AMAZON_GRAPHQL_URL": f"{server.base_url}/graphql",
+    "AMAZON_JOBS_BASE_URL": server.base_url,
+    "HIRING_BASE_URL": server.base_url,
+    "AMAZON_AUTH_TOKEN": "bench",
+    "SENDER_EMAIL": "bench@localhost",
+    "SENDER_PASS": "bench",
+    "RECEIVER_EMAIL": "sink@localhost",
+    "SMTP_HOST": sink.host,
+    "SMTP_PORT": str(sink.port),
+    "SMTP_USE_SSL": "0",
+    "HUMAN_DELAY_SCALE": "0",
+    "SEEN_STORE_BACKEND": "memory",
+    "FORM_FLOW_CACHE_PATH": "",
+    # Bench applications must never be replayed into the real journal
+    "APPLY_JOURNAL_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-"), "applied_journal.jsonl"),
+})
+
+# name -> (value, unit, higher_is_better)
+RESULTS = {}
+
+
+def report(name, value, unit, higher_is_better):
+    RESULTS[name] = (value, unit, higher_is_better)
+    print(f"  {name:<34} {value:>12.2f} {unit}")
+
+
+def skipped(section, error):
+    print(f"  ⏭️ {section} skipped: {error}")
+
+
+# --- Sections ---
+def bench_parse_and_diff(size):
+    from job_cards import parse_cards
+    from card_diff import CardDiffer
+    from job_record import Job
+
+    cards = make_cards(size)
+    response = graphql_page(cards, 0, size)
+    differ = CardDiffer()
+
+    start = time.perf_counter()
+    parsed = parse_cards(response)
+    jobs = [Job.from_card(c) for c in parsed]
+    differ.diff(parsed)
+    # Second poll with 5% of cards changed: the steady-state cost
+    for c in parsed[::20]:
+        c["scheduleCount"] += 1
+    differ.diff(parsed)
+    elapsed = time.perf_counter() - start
+    report(f"parse+diff[{size}]", size * 2 / elapsed, "cards/s", True)
+    assert len(jobs) == size
+
+
+def bench_graphql_fetch(size):
+    import job_notifier_ontario
+    from search_query import build_searches
+
+    server.set_cards(size)
+    before = server.requests
+    start = time.perf_counter()
+    # The stand-in ignores location filters, so one unfiltered search keeps the request count comparable
+    cards = job_notifier_ontario.fetch_jobs(build_searches(regions={}))
+    elapsed = time.perf_counter() - start
+    assert len(cards) == size, f"fetched {len(cards)} of {size}"
+    report(f"graphql_fetch[{size}]", size / elapsed, "cards/s", True)
+    report(f"graphql_requests[{size}]", server.requests - before, "reqs", False)
+
+
+def bench_fanout(size):
+    from job_record import Job
+    from subscribers import Subscriber, SubscriberRegistry
+
+    jobs = [Job.from_card(c) for c in make_cards(size)]
+    # "Thomas" sits inside "St Thomas": both must match a St Thomas posting
+    registry = SubscriberRegistry([
+        Subscriber(0, "st-thomas", ["a@localhost"], ["St Thomas"]),
+        Subscriber(1, "thomas", ["b@localhost"], ["Thomas"]),
+        Subscriber(2, "london", ["c@localhost"], ["London"]),
+        Subscriber(3, "anywhere", ["d@localhost"]),
+    ])
+
+    start = time.perf_counter()
+    matched = [registry.match(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+    report(f"fanout[{size}]", size / elapsed, "jobs/s", True)
+    for job, subs in zip(jobs, matched):
+        if job.location.startswith("St Thomas"):
+            ids = sorted(sub.id for sub in subs)
+            assert ids == [0, 1, 3], f"{job.location} matched subscribers {ids}"
+
+
+def bench_dedupe(size):
+    import db
+
+    collection = MemoryCollection()
+    db.use_collection(collection)
+    ids = [c["jobId"] for c in make_cards(size)]
+    collection.insert_many([{"job_id": jid} for jid in ids[::2]])
+
+    collection.round_trips = 0
+    start = time.perf_counter()
+    db.filter_applied(ids)
+    cold = time.perf_counter() - start
+    cold_trips = collection.round_trips
+
+    collection.round_trips = 0
+    start = time.perf_counter()
+    db.filter_applied(ids)
+    warm = time.perf_counter() - start
+
+    report(f"dedupe_cold[{size}]", cold * 1000, "ms", False)
+    report(f"dedupe_warm[{size}]", warm * 1000, "ms", False)
+    report(f"dedupe_round_trips[{size}]", cold_trips + collection.round_trips, "trips", False)
+
+
+async def bench_browser(sizes, apply_runs):
+    from browser_pool import get_pool, close_pool
+    from persistence import close_writer
+    from extract import extract_tiles
+    from job_checker import TILE_SCHEMA
+    import job_monitor
+    import apply
+    import db
+    from job_record import Job
+
+    db.use_collection(MemoryCollection())
+    pool = await get_pool()
+    try:
+        for size in sizes:
+            server.set_cards(size)
+            async with pool.lease("scan") as context:
+                page = await context.new_page()
+                await page.goto(f"{server.base_url}/en/search", wait_until="domcontentloaded")
+                start = time.perf_counter()
+                tiles = await extract_tiles(page, "div.job-tile", TILE_SCHEMA)
+                report(f"dom_extract[{size}]", len(tiles) / (time.perf_counter() - start), "cards/s", True)
+
+                start = time.perf_counter()
+                jobs = await job_monitor.fetch_available_jobs(page)
+                report(f"search_capture[{size}]", (time.perf_counter() - start) * 1000, "ms", False)
+                assert jobs, "search page capture returned nothing"
+
+                # The monitor polls the same page: the second capture must not sit out the deadline
+                before = server.requests
+                start = time.perf_counter()
+                jobs = await job_monitor.fetch_available_jobs(page)
+                report(f"search_repoll[{size}]", (time.perf_counter() - start) * 1000, "ms", False)
+                assert jobs and server.requests > before, "second poll did not refetch the search results"
+
+        server.set_cards(apply_runs)
+        durations = []
+        for card in server.httpd.cards:
+            job = Job.from_card(card)
+            job.link = f"{server.base_url}/apply/{card['jobId']}"
+            start = time.perf_counter()
+            await apply.apply_to_job(job, pool)
+            durations.append((time.perf_counter() - start) * 1000)
+        report("apply_p50", statistics.median(durations), "ms", False)
+        report("apply_max", max(durations), "ms", False)
+    finally:
+        await close_pool()
+        await close_writer()
+
+
+def bench_smtp(count):
+    import notifier
+
+    before = sink.messages
+    start = time.perf_counter()
+    for i in range(count):
+        notifier.send_email(f"bench {i}", "body")
+    enqueue = time.perf_counter() - start
+    notifier.flush_emails(timeout=60)
+    elapsed = time.perf_counter() - start
+    assert sink.messages - before == count, f"sink got {sink.messages - before} of {count}"
+    report("smtp_enqueue_per_msg", enqueue / count * 1e6, "us", False)
+    report("smtp_throughput", count / elapsed, "msgs/s", True)
+
+
+# --- Baseline comparison ---
+def compare(baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, (value, unit, higher_is_better) in RESULTS.items():
+        if name not in baseline:
+            continue
+        old = baseline[name][0]
+        if not old:
+            continue
+        change = (value - old) / old
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {old:.2f} -> {value:.2f} {unit} ({worse:+.0%} worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated card counts (10 to 10000)")
+    parser.add_argument("--apply-runs", type=int, default=5)
+    parser.add_argument("--emails", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(f"🧪 Fixture server {server.base_url}, SMTP sink {sink.host}:{sink.port}")
+    for section, run in [
+        ("parse+diff", lambda: [bench_parse_and_diff(s) for s in sizes]),
+        ("graphql_fetch", lambda: [bench_graphql_fetch(s) for s in sizes]),
+        ("fanout", lambda: [bench_fanout(s) for s in sizes]),
+        ("dedupe", lambda: [bench_dedupe(s) for s in sizes]),
+        ("browser", lambda: asyncio.run(bench_browser(sizes, args.apply_runs))),
+        ("smtp", lambda: bench_smtp(args.emails)),
+    ]:
+        print(f"▶ {section}")
+        try:
+            run()
+        except ImportError as e:
+            skipped(section, e)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(RESULTS, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    if args.baseline:
+        regressions = compare(args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions beyond tolerance.")
+
+
+if __name__ == "__main__":
+    main()
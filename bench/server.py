@@ -0,0 +1,79 @@
+# bench/server.py
+# Local stand-in for amazon.jobs, hiring.amazon.ca and the AppSync GraphQL endpoint.
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from bench.fixtures import (
+    make_cards, graphql_page, amazon_jobs_search_html, hiring_search_html, application_html
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real endpoints
+
+    def _send(self, body, content_type):
+        data = body.encode() if isinstance(body, str) else body
+        headers = {"Content-Type": content_type}
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(data) > 1024:
+            data = gzip.compress(data, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+        if urlparse(self.path).path != "/graphql":
+            self.send_error(404)
+            return
+        search = payload.get("variables", {}).get("searchJobRequest", {})
+        page = graphql_page(self.server.cards, search.get("offset") or 0, search.get("pageSize") or 100)
+        self._send(json.dumps(page), "application/json")
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        self.server.requests += 1
+        if path == "/en/search":
+            self._send(amazon_jobs_search_html(self.server.cards), "text/html")
+        elif path.startswith("/search/warehouse-jobs"):
+            self._send(hiring_search_html(f"{self.server.base_url}/graphql"), "text/html")
+        elif path.startswith("/apply/"):
+            self._send(application_html(path.rsplit("/", 1)[-1]), "text/html")
+        else:
+            self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.cards = []
+        self.httpd.requests = 0
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.httpd.base_url = self.base_url
+
+    def set_cards(self, count):
+        self.httpd.cards = make_cards(count)
+        return self.httpd.cards
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="bench-http", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
@@ -0,0 +1,59 @@
+# bench/smtp_sink.py
+# Minimal plain-SMTP sink: accepts AUTH and DATA, keeps nothing but a count.
+
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self._reply("220 bench-sink ESMTP")
+        in_data = False
+        for raw in self.rfile:
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            if in_data:
+                if line == ".":
+                    in_data = False
+                    self.server.messages += 1
+                    self._reply("250 OK queued")
+                continue
+
+            verb = line.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-bench-sink")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif verb == "HELO":
+                self._reply("250 bench-sink")
+            elif verb == "AUTH":
+                self._reply("235 Authentication successful")
+            elif verb == "DATA":
+                in_data = True
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                # MAIL, RCPT, RSET, NOOP
+                self._reply("250 OK")
+
+
+class SMTPSink:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = socketserver.ThreadingTCPServer((host, port), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.messages = 0
+        self.host, self.port = self.server.server_address
+
+    @property
+    def messages(self):
+        return self.server.messages
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="bench-smtp", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
@@ -0,0 +1,183 @@
+# browser_pool.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import BrowserContext
+from config import BROWSER_POOL_SIZE, CONTEXT_MAX_USES, LEASE_TIMEOUT
+from utils import launch_browser, new_stealth_context, set_network_profile
+
+
+class LeaseTimeout(Exception):
+    """No context came free within the lease deadline."""
+
+
+class BrowserPool:
+    """One long-lived Chromium with N pre-warmed contexts that are leased and returned.
+
+    A slot whose context could not be created holds None; the next lease of it retries.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, headless=True, max_uses=CONTEXT_MAX_USES,
+                 lease_timeout=LEASE_TIMEOUT):
+        self.size = size
+        self.headless = headless
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+
+        self._playwright = None
+        self._browser = None
+        self._idle = asyncio.Queue()
+        self._uses = {}
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self):
+        async with self._lock:
+            if not self._started:
+                await self._launch()
+                self._started = True
+        return self
+
+    async def _launch(self):
+        self._playwright, self._browser = await launch_browser(self.headless)
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_context())
+        print(f"🌐 Browser pool warmed with {self.size} contexts.")
+
+    async def _new_context(self) -> BrowserContext:
+        context = await new_stealth_context(self._browser)
+        self._uses[context] = 0
+        return context
+
+    async def _healthy(self, context: BrowserContext) -> bool:
+        if context is None or not self._browser.is_connected():
+            return False
+        if self._uses.get(context, 0) >= self.max_uses:
+            return False
+        try:
+            # Cheap round trip: a crashed context raises here
+            await context.cookies()
+        except Exception:
+            return False
+        return True
+
+    async def _relaunch(self):
+        # Whole browser died: drop every idle context and start over.
+        # Leased contexts fail their health check on release and get replaced then.
+        async with self._lock:
+            if self._browser.is_connected():
+                return
+            print("♻️ Browser disconnected, relaunching pool...")
+            # Idle slots become empty ones, filled lazily as they are leased
+            dropped = 0
+            while not self._idle.empty():
+                self._uses.pop(self._idle.get_nowait(), None)
+                dropped += 1
+            for _ in range(dropped):
+                self._idle.put_nowait(None)
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright, self._browser = await launch_browser(self.headless)
+
+    async def _replace(self, context: BrowserContext) -> BrowserContext:
+        if context is not None:
+            self._uses.pop(context, None)
+            try:
+                await context.close()
+            except Exception:
+                pass
+        if not self._browser.is_connected():
+            await self._relaunch()
+        return await self._new_context()
+
+    async def _acquire(self) -> BrowserContext:
+        try:
+            context = await asyncio.wait_for(self._idle.get(), self.lease_timeout)
+        except asyncio.TimeoutError:
+            raise LeaseTimeout(f"no browser context free after {self.lease_timeout}s") from None
+        try:
+            if not await self._healthy(context):
+                context = await self._replace(context)
+        except BaseException:
+            # Keep the slot: the next lease retries creating its context
+            self._idle.put_nowait(None)
+            raise
+        return context
+
+    async def _release(self, context: BrowserContext, ok: bool):
+        self._uses[context] = self._uses.get(context, 0) + 1
+
+        if ok and self._browser.is_connected():
+            # Leave the context clean for the next caller
+            for page in list(context.pages):
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            if self._uses[context] < self.max_uses:
+                self._idle.put_nowait(context)
+                return
+
+        replacement = None
+        try:
+            replacement = await self._replace(context)
+        except Exception as e:
+            print(f"⚠️ Could not replace browser context, slot left empty: {e}")
+        finally:
+            self._idle.put_nowait(replacement)
+
+    def retire(self, context: BrowserContext):
+        """Replace `context` when it is released instead of returning it to the pool."""
+        self._uses[context] = self.max_uses
+
+    @asynccontextmanager
+    async def lease(self, profile="full"):
+        await self.start()
+        context = await self._acquire()
+        ok = True
+        try:
+            await set_network_profile(context, profile)
+            yield context
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            await self._release(context, ok)
+
+    async def close(self):
+        async with self._lock:
+            if not self._started:
+                return
+            while not self._idle.empty():
+                context = self._idle.get_nowait()
+                try:
+                    if context is not None:
+                        await context.close()
+                except Exception:
+                    pass
+            self._uses.clear()
+            try:
+                await self._browser.close()
+            finally:
+                await self._playwright.stop()
+            self._started = False
+
+
+# --- Process-wide shared pool ---
+_pool = None
+
+
+async def get_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return await _pool.start()
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
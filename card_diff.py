@@ -0,0 +1,68 @@
+# card_diff.py
+
+from typing import NamedTuple
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+# Fields that matter on a GraphQL job card (job_notifier_ontario.fetch_jobs)
+GRAPHQL_FIELDS = (
+    "jobTitle",
+    "locationName",
+    "scheduleCount",
+    "employmentTypeL10N",
+    "totalPayRateMinL10N",
+    "totalPayRateMaxL10N",
+)
+
+# Fields that matter on a job_record.Job; schedule/pay are only set when
+# the job came from a GraphQL card rather than a scraped tile
+TILE_FIELDS = ("title", "location", "schedule_count", "pay")
+
+
+class CardEvent(NamedTuple):
+    kind: str
+    job_id: str
+    card: dict
+    previous: dict = None
+    fields: tuple = ()
+
+
+class CardDiffer:
+    """Compares each poll against the previous one and emits added/changed/removed events."""
+
+    def __init__(self, key="jobId", fields=GRAPHQL_FIELDS):
+        self.key = key
+        self.fields = fields
+        self._snapshot = {}   # job_id -> (content hash, card)
+
+    def _digest(self, card):
+        return hash(tuple(card.get(f) for f in self.fields))
+
+    def diff(self, cards):
+        events = []
+        current = {}
+
+        for card in cards:
+            job_id = card.get(self.key)
+            if not job_id or job_id in current:
+                continue
+            digest = self._digest(card)
+            current[job_id] = (digest, card)
+
+            old = self._snapshot.get(job_id)
+            if old is None:
+                events.append(CardEvent(ADDED, job_id, card))
+            elif old[0] != digest:
+                # Only a changed hash pays for the per-field comparison
+                prev = old[1]
+                changed = tuple(f for f in self.fields if prev.get(f) != card.get(f))
+                events.append(CardEvent(CHANGED, job_id, card, prev, changed))
+
+        for job_id, (_, card) in self._snapshot.items():
+            if job_id not in current:
+                events.append(CardEvent(REMOVED, job_id, card))
+
+        self._snapshot = current
+        return events
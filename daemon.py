@@ -0,0 +1,96 @@
+# daemon.py
+"""Single entry point for every bot mode.
+
+    python daemon.py notify               # GraphQL notifier (no browser)
+    python daemon.py monitor              # browser monitor + apply pipeline
+    python daemon.py scan-once            # one scan-and-apply pass
+    python daemon.py scan-once --every 300
+
+Heavy modules (playwright, pymongo, requests) are imported inside the subcommand
+that needs them, so `notify` never pays for Playwright.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Required environment per subcommand, checked once before anything heavy is imported
+REQUIRED_ENV = {
+    "notify": ("SENDER_EMAIL", "SENDER_PASS", "RECEIVER_EMAIL", "AMAZON_AUTH_TOKEN"),
+    "monitor": ("SENDER_EMAIL", "SENDER_PASS", "RECEIVER_EMAIL"),
+    "scan-once": (),
+}
+
+
+def validate_config(command):
+    missing = [name for name in REQUIRED_ENV[command] if not os.getenv(name)]
+    if missing:
+        sys.exit(f"❌ Missing {', '.join(missing)} in .env for '{command}'")
+
+
+def run_notify(args):
+    import job_notifier_ontario
+    job_notifier_ontario.main()
+
+
+def run_monitor(args):
+    import job_monitor
+    asyncio.run(job_monitor.monitor_jobs())
+
+
+async def _scan_loop(every):
+    import db
+    import metrics
+    from browser_pool import get_pool, close_pool
+    from persistence import close_writer
+    from main import scan_and_apply
+
+    metrics.start_exporters()
+    # SRV lookup + TLS to Atlas happens in the client constructor: overlap it with browser start
+    client_ready = asyncio.create_task(asyncio.to_thread(db.get_client))
+    pool = await get_pool()
+    await client_ready
+
+    try:
+        while True:
+            start = time.monotonic()
+            await scan_and_apply(pool)
+            print(f"⏱️ Scan cycle took {time.monotonic() - start:.1f}s")
+            if not every:
+                return
+            await asyncio.sleep(every)
+    finally:
+        await close_pool()
+        await close_writer()
+
+
+def run_scan_once(args):
+    asyncio.run(_scan_loop(args.every))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("notify", help="poll GraphQL and email new/changed postings")
+    sub.add_parser("monitor", help="watch the hiring site in a browser and apply to matches")
+    scan = sub.add_parser("scan-once", help="scan preferred cities and apply to new jobs")
+    scan.add_argument("--every", type=float, default=0,
+                      help="repeat every N seconds, keeping the browser pool and Mongo client warm")
+
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    validate_config(args.command)
+
+    {"notify": run_notify, "monitor": run_monitor, "scan-once": run_scan_once}[args.command](args)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("👋 Stopped.")
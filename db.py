@@ -0,0 +1,90 @@
+# db.py
+
+import pymongo
+import metrics
+from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME
+
+# One client per process: pymongo pools connections internally, so sharing it
+# means the Atlas SRV lookup + TLS handshake is paid once, not once per job.
+_client = None
+
+
+def get_client() -> pymongo.MongoClient:
+    global _client
+    if _client is None:
+        _client = pymongo.MongoClient(MONGO_URI)
+    return _client
+
+
+_collection_override = None
+
+
+def get_collection():
+    if _collection_override is not None:
+        return _collection_override
+    return get_client()[MONGO_DB_NAME][MONGO_COLLECTION_NAME]
+
+
+def use_collection(collection):
+    """Swap in a collection-like stand-in (the offline benchmark uses an in-memory one)."""
+    global _collection_override, _cache_warm, _indexes_ready
+    _collection_override = collection
+    _applied_ids.clear()
+    _cache_warm = False
+    _indexes_ready = False
+
+
+def close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+# --- Applied-job dedupe ---
+# Positive-only cache: an ID that is applied stays applied, so once it is known
+# locally we never ask Atlas about it again. Unknown IDs are always re-checked
+# because another process may have applied since.
+_applied_ids = set()
+_cache_warm = False
+_indexes_ready = False
+
+
+def ensure_indexes():
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    try:
+        get_collection().create_index("job_id", unique=True, name="job_id_unique")
+    except pymongo.errors.OperationFailure as e:
+        # Existing duplicates block a unique build; fall back to a plain index
+        print(f"⚠️ Could not build unique job_id index ({e}), using non-unique.")
+        get_collection().create_index("job_id", name="job_id")
+    _indexes_ready = True
+
+
+def warm_applied_cache():
+    global _cache_warm
+    if _cache_warm:
+        return
+    ensure_indexes()
+    # One round trip at boot, projected down to just the IDs
+    for doc in get_collection().find({}, {"job_id": 1, "_id": 0}):
+        _applied_ids.add(doc["job_id"])
+    _cache_warm = True
+    print(f"🗂️ Loaded {len(_applied_ids)} applied job IDs.")
+
+
+def filter_applied(job_ids) -> set:
+    """Return the subset of job_ids already applied to, in at most one query."""
+    warm_applied_cache()
+    with metrics.timed("dedupe_lookup"):
+        unknown = [jid for jid in set(job_ids) if jid not in _applied_ids]
+        if unknown:
+            for doc in get_collection().find({"job_id": {"$in": unknown}}, {"job_id": 1, "_id": 0}):
+                _applied_ids.add(doc["job_id"])
+    return {jid for jid in job_ids if jid in _applied_ids}
+
+
+def mark_applied(job_id):
+    _applied_ids.add(job_id)
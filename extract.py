@@ -0,0 +1,41 @@
+# extract.py
+
+from typing import NamedTuple
+from playwright.async_api import Page
+import metrics
+
+
+class Field(NamedTuple):
+    selector: str             # relative to the tile; "" means the tile itself
+    attr: str = "text"        # "text" for textContent, else a property/attribute name
+    default: str = None
+
+
+# Runs once in the page and returns every tile as a plain record
+_EXTRACT_JS = """
+({container, fields}) => Array.from(document.querySelectorAll(container)).map(tile => {
+    const rec = {};
+    for (const [name, selector, attr] of fields) {
+        const el = selector ? tile.querySelector(selector) : tile;
+        let value = null;
+        if (el) {
+            value = attr === "text" ? el.textContent : (el[attr] ?? el.getAttribute(attr));
+        }
+        rec[name] = value == null ? null : String(value).trim();
+    }
+    return rec;
+})
+"""
+
+
+async def extract_tiles(page: Page, container: str, schema: dict) -> list:
+    """Extract all tiles matching `container` with a single page.evaluate round trip."""
+    fields = [[name, f.selector, f.attr] for name, f in schema.items()]
+    with metrics.timed("dom_extract"):
+        records = await page.evaluate(_EXTRACT_JS, {"container": container, "fields": fields})
+
+    for rec in records:
+        for name, f in schema.items():
+            if not rec.get(name):
+                rec[name] = f.default
+    return records
@@ -0,0 +1,242 @@
+# form_flow.py
+
+import asyncio
+import json
+import os
+import re
+from urllib.parse import urlparse
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+from config import USER_DETAILS, FORM_FLOW_CACHE_PATH, RETRY_BUDGETS
+import metrics
+from readiness import STEP_DEADLINES, wait_ready
+from resilience import retry
+from utils import wait_random
+
+# Bump when APPLY_FLOW changes shape; cached flows from an older version are ignored
+FLOW_VERSION = 1
+
+SUBMITTED, NO_START, NO_SUBMIT = "submitted", "no_start", "no_submit"
+
+
+class Step:
+    """One step of an application form; `candidates` are tried in order when learning a template."""
+
+    __slots__ = ("name", "action", "candidates", "value", "wait")
+
+    def __init__(self, name, action, candidates, value=None, wait="form_field"):
+        self.name = name
+        self.action = action          # "click", "fill" (CSS candidates only) or "upload"
+        self.candidates = candidates
+        self.value = value
+        self.wait = wait              # readiness step, for deadlines and wait stats
+
+
+APPLY_FLOW = (
+    Step("start", "click", (":text-is('Apply Now')", ":text-is('Start application')"), wait="apply_button"),
+    Step("email", "fill", ('input[name="email"]', 'input[type="email"]'), USER_DETAILS["email"]),
+    Step("phone", "fill", ('input[name="phone"]', 'input[type="tel"]'), USER_DETAILS["phone"]),
+    Step("resume", "upload", ('input[type="file"]',), "resume.pdf"),
+    Step("submit", "click", (":text-is('Submit Application')", ":text-is('Continue')"), wait="submit_button"),
+)
+
+# Fill every field in one round trip; the native setter makes framework-controlled inputs see it.
+# Returns the selectors that matched nothing.
+_BATCH_FILL_JS = """
+(fields) => fields.filter(([selector, value]) => {
+    const el = document.querySelector(selector);
+    if (!el) return true;
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), "value").set;
+    setter.call(el, value);
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+    return false;
+}).map(([selector]) => selector)
+"""
+
+_PRESENT_JS = "(selectors) => selectors.map(s => document.querySelector(s) !== null)"
+
+_ID_SEGMENT = re.compile(r"[^/]*\d[^/]*")
+
+
+def template_key(url):
+    """Postings on the same template share a URL shape once job IDs are masked out."""
+    parts = urlparse(url)
+    key = parts.netloc + _ID_SEGMENT.sub("*", parts.path)
+    fragment = parts.fragment.split("?")[0]
+    return f"{key}#{_ID_SEGMENT.sub('*', fragment)}" if fragment else key
+
+
+class FlowMismatch(Exception):
+    """A cached selector no longer matches the page, so the template has changed."""
+
+
+class FormFlowEngine:
+    """Learns which selectors each template uses once, then replays them on later postings."""
+
+    def __init__(self, steps=APPLY_FLOW, path=FORM_FLOW_CACHE_PATH):
+        self.steps = steps
+        self.path = path
+        self.flows = self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                flows = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable form flow cache: {e}")
+            return {}
+        return {key: flow for key, flow in flows.items() if flow.get("version") == FLOW_VERSION}
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.flows, f, indent=2)
+        os.replace(tmp, self.path)
+
+    async def run(self, page, url):
+        """Apply on `page`; returns SUBMITTED, NO_START or NO_SUBMIT."""
+        key = template_key(url)
+        flow = self.flows.get(key)
+        if flow:
+            try:
+                status = await self._walk(page, url, flow["selectors"])
+                metrics.inc("form_flow_replayed")
+                return status
+            except FlowMismatch as e:
+                print(f"♻️ Form flow for {key} (rev {flow['revision']}) no longer fits: {e}. Relearning.")
+                metrics.inc("form_flow_invalidated")
+                del self.flows[key]
+                self._save()
+
+        learned = {}
+        status = await self._walk(page, url, None, learned)
+        metrics.inc("form_flow_learned")
+        # Only a flow that got all the way through, and found a field to fill, is worth
+        # replaying: a page too slow on this one posting would otherwise cache "no fields" for good
+        filled = any(learned.get(s.name) for s in self.steps if s.action == "fill")
+        if status == SUBMITTED and not filled:
+            print(f"⚠️ No form fields found on {key}; not caching its flow.")
+        elif status == SUBMITTED:
+            revision = flow["revision"] + 1 if flow else 1
+            self.flows[key] = {"version": FLOW_VERSION, "revision": revision, "selectors": learned}
+            self._save()
+            print(f"🧭 Learned form flow for {key} (rev {revision}).")
+        return status
+
+    async def _walk(self, page, url, cached, learned=None):
+        """Run the steps in order. With `cached`, use its selectors; otherwise probe and fill `learned`."""
+        with metrics.timed("apply_load"):
+            # Only the navigation is retried: it is safe to repeat, clicks and fills are not
+            await retry(
+                lambda: page.goto(url, wait_until="domcontentloaded", timeout=30000),
+                "apply_load", **RETRY_BUDGETS["apply_load"]
+            )
+
+        i = 0
+        while i < len(self.steps):
+            step = self.steps[i]
+            if step.action == "click":
+                with metrics.timed(f"flow_{step.name}"):
+                    selector = await self._click(page, step, cached, learned)
+                if selector is None:
+                    return NO_START if step is self.steps[0] else NO_SUBMIT
+                if step is self.steps[-1]:
+                    if not await wait_ready(page, "submit_settled", selector, state="detached"):
+                        print("⚠️ Submit button still on page after deadline.")
+                await wait_random()
+                i += 1
+                continue
+
+            # Consecutive field steps run as one batch
+            group = []
+            while i < len(self.steps) and self.steps[i].action != "click":
+                group.append(self.steps[i])
+                i += 1
+            with metrics.timed("flow_fields"):
+                await self._fields(page, group, cached, learned)
+            await wait_random()
+        return SUBMITTED
+
+    async def _click(self, page, step, cached, learned):
+        if cached is not None and step is self.steps[0]:
+            # A closed posting has no start button at all; that says nothing about the template,
+            # so only a different start button than the cached one counts as a mismatch
+            selector = cached.get(step.name)
+            probe = ", ".join(dict.fromkeys([selector, *step.candidates] if selector else step.candidates))
+            if not await wait_ready(page, step.wait, probe, state="visible"):
+                return None
+            if not selector or not await page.locator(selector).count():
+                raise FlowMismatch(f"{step.name} button is no longer {selector}")
+            await page.click(selector)
+            return selector
+
+        if cached is not None:
+            selector = cached.get(step.name)
+            if not selector or not await wait_ready(page, step.wait, selector, state="visible"):
+                raise FlowMismatch(f"{step.name} ({selector}) not found")
+            await page.click(selector)
+            return selector
+
+        # One combined probe, as before; working out which candidate hit is paid once per template
+        handle = await wait_ready(page, step.wait, ", ".join(step.candidates), state="visible")
+        if not handle:
+            return None
+        counts = await asyncio.gather(*(page.locator(c).count() for c in step.candidates))
+        selector = next((c for c, n in zip(step.candidates, counts) if n), step.candidates[0])
+        await handle.click()
+        learned[step.name] = selector
+        return selector
+
+    async def _fields(self, page, group, cached, learned):
+        if cached is None:
+            candidates = [c for step in group for c in step.candidates]
+            await wait_ready(page, "form_field", ", ".join(candidates))
+            present = dict(zip(candidates, await page.evaluate(_PRESENT_JS, candidates)))
+            for step in group:
+                # None = this template doesn't have the field, so replays skip it without probing
+                learned[step.name] = next((c for c in step.candidates if present[c]), None)
+            selectors = learned
+        else:
+            selectors = cached
+            first = next((selectors[s.name] for s in group if selectors.get(s.name)), None)
+            if first and not await wait_ready(page, "form_field", first):
+                raise FlowMismatch(f"form field {first} not found")
+            # Fields learned as absent must still be absent, or the cached flow would skip them
+            skipped = [c for s in group if not selectors.get(s.name) for c in s.candidates]
+            if skipped and any(await page.evaluate(_PRESENT_JS, skipped)):
+                raise FlowMismatch("a field cached as absent is on the page")
+
+        fills = [[selectors[s.name], s.value] for s in group if s.action == "fill" and selectors.get(s.name)]
+        if fills:
+            missing = await page.evaluate(_BATCH_FILL_JS, fills)
+            if missing:
+                if cached is not None:
+                    raise FlowMismatch(f"fields {missing} not found")
+                print(f"⚠️ Could not fill: {', '.join(missing)}")
+
+        for step in group:
+            if step.action == "upload" and selectors.get(step.name):
+                try:
+                    await page.set_input_files(selectors[step.name], step.value, timeout=STEP_DEADLINES["form_field"])
+                    print("📎 Resume uploaded.")
+                except PlaywrightTimeout:
+                    if cached is not None:
+                        raise FlowMismatch(f"upload field {selectors[step.name]} not found")
+                    print("⚠️ Resume upload field not found.")
+                except Exception as e:
+                    # e.g. no resume file on disk: apply without it rather than abandon the form
+                    print(f"⚠️ Resume upload failed: {e}")
+
+
+_engine = None
+
+
+def get_engine() -> FormFlowEngine:
+    global _engine
+    if _engine is None:
+        _engine = FormFlowEngine()
+    return _engine
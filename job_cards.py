@@ -0,0 +1,47 @@
+# job_cards.py
+# Shared parsing for searchJobCardsByLocation responses, whether they come from
+# our own GraphQL call (job_notifier_ontario) or are captured off the search page (job_monitor).
+
+import re
+from config import HIRING_BASE_URL
+
+_JOB_ID_PARAM = re.compile(r"[?&]jobId=([^&#]+)")
+
+
+def parse_cards(js):
+    """Pull the jobCards list out of a searchJobCardsByLocation response, or None."""
+    # drill down safely
+    data = js.get("data") if isinstance(js, dict) else None
+    if not isinstance(data, dict):
+        print("⚠️ No `data` in GraphQL response:", js)
+        return None
+    response = data.get("searchJobCardsByLocation")
+    if not isinstance(response, dict):
+        print("⚠️ No `searchJobCardsByLocation` in data:", js)
+        return None
+    cards = response.get("jobCards")
+    if not isinstance(cards, list):
+        print("⚠️ `jobCards` is not a list:", js)
+        return None
+    return cards
+
+
+def card_link(job_id):
+    return f"{HIRING_BASE_URL}/app#/jobSearch?jobId={job_id}&locale=en-CA"
+
+
+def job_id_from_link(link):
+    """The jobId in a posting link: its jobId= parameter, else the last path segment."""
+    if not link or "/" not in link:
+        return None
+    match = _JOB_ID_PARAM.search(link)
+    if match:
+        return match.group(1)
+    return link.split("?")[0].split("#")[0].rstrip("/").split("/")[-1] or None
+
+
+def card_pay(card):
+    pm = card.get("totalPayRateMinL10N", "")
+    px = card.get("totalPayRateMaxL10N", "")
+    return f"{pm} – {px}" if pm and px else (pm or px or "N/A")
+
@@ -1,49 +1,79 @@
 # job_checker.py
 
 import asyncio
-from playwright.async_api import async_playwright
-import pymongo
-from config import USER_DETAILS, MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION_NAME
+from config import USER_DETAILS, CITY_SCAN_CONCURRENCY, AMAZON_JOBS_BASE_URL, BREAKERS, RETRY_BUDGETS
+from browser_pool import get_pool
+from db import filter_applied
+from extract import Field, extract_tiles
+from readiness import goto_ready
+from job_record import Job
+from resilience import CircuitBreaker, retry, describe_error
 
-async def get_new_jobs():
-    # Setup MongoDB
-    client = pymongo.MongoClient(MONGO_URI)
-    db = client[MONGO_DB_NAME]
-    collection = db[MONGO_COLLECTION_NAME]
+TILE_SCHEMA = {
+    "title": Field("h3"),
+    "location": Field("p.location-and-id"),
+    "link": Field("a", "href"),
+}
 
-    new_jobs = []
+# Shared by every city: they all hit amazon.jobs
+_breaker = CircuitBreaker("city_scan", **BREAKERS["city_scan"])
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+async def scan_city(pool, city):
+    jobs = []
+    if not _breaker.allow():
+        print(f"🔌 Skipping {city}: city scan breaker {_breaker.describe()}")
+        return jobs
 
-        for city in USER_DETAILS["preferred_cities"]:
-            print(f"🔍 Checking jobs in: {city}")
-            search_url = f"https://www.amazon.jobs/en/search?base_query=warehouse&loc_query={city},%20Ontario,%20Canada"
-            await page.goto(search_url)
-            await page.wait_for_load_state("networkidle")
+    async with pool.lease("scan") as context:
+        page = await context.new_page()
 
-            job_cards = await page.query_selector_all("div.job-tile")
+        print(f"🔍 Checking jobs in: {city}")
+        search_url = f"{AMAZON_JOBS_BASE_URL}/en/search?base_query=warehouse&loc_query={city},%20Ontario,%20Canada"
+        try:
+            # No tiles by the deadline just means no postings; only a failed navigation counts
+            await retry(
+                lambda: goto_ready(page, search_url, "search_tiles", "div.job-tile"),
+                "city_scan", **RETRY_BUDGETS["city_scan"]
+            )
+        except Exception as e:
+            _breaker.record_failure(describe_error(e))
+            raise
+        _breaker.record_success()
 
-            for job in job_cards:
-                title = await job.query_selector_eval("h3", "el => el.textContent.trim()")
-                location = await job.query_selector_eval("p.location-and-id", "el => el.textContent.trim()")
-                link = await job.query_selector_eval("a", "el => el.href")
+        for tile in await extract_tiles(page, "div.job-tile", TILE_SCHEMA):
+            link = tile["link"]
+            if not link:
+                continue
 
-                job_id = link.split("/")[-1]
+            jobs.append(Job.from_tile(tile, job_id=link.split("/")[-1]))
 
-                # Check if already applied
-                if collection.find_one({"job_id": job_id}):
-                    continue
+        await page.close()
 
-                # Save job temporarily for applying
-                new_jobs.append({
-                    "job_id": job_id,
-                    "title": title,
-                    "location": location,
-                    "link": link
-                })
+    return jobs
 
-        await browser.close()
+async def get_new_jobs(pool=None, concurrency=CITY_SCAN_CONCURRENCY):
+    pool = pool or await get_pool()
+    cities = USER_DETAILS["preferred_cities"]
+    semaphore = asyncio.Semaphore(concurrency)
 
-    return new_jobs
+    async def bounded_scan(city):
+        async with semaphore:
+            return await scan_city(pool, city)
+
+    # Each city gets its own context, so total time tracks the slowest city
+    results = await asyncio.gather(*(bounded_scan(city) for city in cities), return_exceptions=True)
+
+    # Neighbouring cities often list the same posting: merge by job_id
+    merged = {}
+    for city, result in zip(cities, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Scan failed for {city}: {result}")
+            continue
+        for job in result:
+            merged.setdefault(job.job_id, job)
+
+    # Check everything against applied jobs in one lookup
+    applied = await asyncio.to_thread(filter_applied, list(merged))
+
+    # Save jobs temporarily for applying
+    return [job for job_id, job in merged.items() if job_id not in applied]
@@ -1,43 +1,66 @@
 import asyncio
-import random
-from datetime import datetime
-from utils import get_browser, wait_random
-from apply import apply_to_job
+from config import HIRING_BASE_URL
+from browser_pool import get_pool, close_pool
+from persistence import close_writer
 from notifier import send_email
-
-PREFERRED_CITIES = ["Cambridge", "Hamilton", "Brampton", "Mississauga", "London", "St Thomas"]
+from pipeline import JobPipeline
+from scheduler import PollScheduler
+import metrics
+from seen_store import open_seen_store
+from extract import Field, extract_tiles
+from readiness import goto_until_response, wait_ready
+from job_cards import parse_cards, job_id_from_link
+from job_record import Job, PREFERRED_LOCATIONS
+from card_diff import CardDiffer, TILE_FIELDS, CHANGED, REMOVED
+from resilience import GuardedFetch
+from session import MonitorSession, stop_on_signals
+
+TILE_SCHEMA = {
+    "title": Field(".job-title", default="No title"),
+    "location": Field(".job-location", default="No location"),
+    "link": Field("a", "href", default="No link"),
+}
 
 def job_matches_location(job):
-    for city in PREFERRED_CITIES:
-        if city.lower() in job['location'].lower():
-            return True
-    return False
+    return PREFERRED_LOCATIONS.matches(job.location)
+
+SEARCH_URL = f"{HIRING_BASE_URL}/search/warehouse-jobs#/"
+
+def is_search_response(response):
+    request = response.request
+    return request.method == "POST" and "searchJobCardsByLocation" in (request.post_data or "")
 
 async def fetch_available_jobs(page):
-    await page.goto("https://hiring.amazon.ca/search/warehouse-jobs#/")
-    await page.wait_for_timeout(5000)  # Allow JS to load
+    # The search page fills itself from the same GraphQL call fetch_jobs makes;
+    # read that response directly and only scrape the DOM if we miss it
+    response = await goto_until_response(page, SEARCH_URL, "search_response", is_search_response)
+    if response:
+        try:
+            cards = parse_cards(await response.json())
+        except Exception as e:
+            print(f"⚠️ Could not read search response, falling back to DOM: {e}")
+            cards = None
+
+        if cards is not None:
+            if not cards:
+                print("🔄 No job postings available currently. Will check again...")
+            return [Job.from_card(c) for c in cards if c.get("jobId")]
+
+    await wait_ready(page, "search_tiles", ".job-tile")
 
     jobs = []
 
     try:
-        # Try to get all job tiles
-        job_elements = await page.query_selector_all('.job-tile')
+        # Pull every job tile in one round trip
+        tiles = await extract_tiles(page, '.job-tile', TILE_SCHEMA)
 
-        if not job_elements:
+        if not tiles:
             print("🔄 No job postings available currently. Will check again...")
             return []
 
-        for el in job_elements:
-            title = await el.query_selector_eval('.job-title', 'el => el.textContent') if await el.query_selector('.job-title') else "No title"
-            location = await el.query_selector_eval('.job-location', 'el => el.textContent') if await el.query_selector('.job-location') else "No location"
-            link = await el.query_selector_eval('a', 'el => el.href') if await el.query_selector('a') else "No link"
-
-            jobs.append({
-                'title': title.strip(),
-                'location': location.strip(),
-                'link': link.strip(),
-                'timestamp': str(datetime.now())
-            })
+        for tile in tiles:
+            # Same ID the captured GraphQL card would have, so either path dedupes the same
+            jobs.append(Job.from_tile(tile, job_id=job_id_from_link(tile.get("link"))))
 
     except Exception as e:
         print(f"⚠️ Scraping error (non-critical): {e}")
@@ -46,61 +69,93 @@ async def fetch_available_jobs(page):
     return jobs
 
 async def monitor_jobs():
-    browser, context = await get_browser()
-    page = await context.new_page()
-
-    print("🔍 Bot started monitoring jobs...")
-
-    seen_jobs = set()
-
-    while True:
-        try:
-            jobs = await fetch_available_jobs(page)
-
-            for job in jobs:
-                title = job['title']
-                location = job['location']
-                link = job['link']
-
-                if job_matches_location(job) and link not in seen_jobs:
-                    print(f"✅ Found job at {location}: {title}")
-                    seen_jobs.add(link)
+    metrics.start_exporters()
+    pool = await get_pool()
+    pipeline = JobPipeline(pool).start()
+    stop = stop_on_signals()
 
+    try:
+        # Hold one context for scanning; the rest stay free for apply_to_job
+        async with MonitorSession(pool) as session:
+            print("🔍 Bot started monitoring jobs...")
+
+            seen_jobs = open_seen_store("monitor")
+            differ = CardDiffer(key="key", fields=TILE_FIELDS)
+            scheduler = PollScheduler.for_monitor("monitor", seen_jobs)
+            # An empty store's first poll is the standing backlog, not arrivals: keep it out of the histogram
+            backlog = len(seen_jobs) == 0
+            search = GuardedFetch("search_page")
+
+            while not stop.is_set():
+                new_count, failed = 0, False
+                try:
+                    with metrics.timed("discovery"):
+                        jobs, failed = await search.fetch(lambda: fetch_available_jobs(session.page))
+                    if failed:
+                        print(f"🔌 Search page breaker: {search.breaker.describe()}")
+                    if jobs:
+                        seen_jobs.touch([job.key for job in jobs])
+                        seen_jobs.evict_expired()
+
+                    # Empty scrapes are skipped so a failed load doesn't read as "everything removed"
+                    for event in (differ.diff(jobs) if jobs else []):
+                        job = event.card
+                        title = job.title
+                        location = job.location
+                        key = job.key
+
+                        if event.kind == CHANGED:
+                            print(f"✏️ Job changed ({', '.join(event.fields)}): {title} - {location}")
+                            continue
+                        if event.kind == REMOVED:
+                            print(f"🗑️ Job no longer listed: {title} - {location}")
+                            continue
+
+                        # Stores written before jobs were keyed by ID hold links
+                        seen = key in seen_jobs or job.link in seen_jobs
+                        if job_matches_location(job) and not seen:
+                            print(f"✅ Found job at {location}: {title}")
+                            seen_jobs.add(key, arrival=not backlog)
+                            if not backlog:
+                                new_count += 1
+
+                            # Hand off to the apply workers; discovery keeps polling
+                            await pipeline.submit(job)
+                        else:
+                            print(f"❌ Job doesn't match preferred cities or already seen: {title} - {location}")
+
+                    if jobs and not failed:
+                        backlog = False
+
+                except Exception as e:
+                    failed = True
+                    print(f"⚠️ Error occurred: {e}")
                     try:
-                        # Apply to the job
-                        await apply_to_job(job)
-                        print(f"🚀 Applied to job: {title} in {location}")
-
-                        # Send Email Notification
-                        send_email(
-                            subject=f"✅ Job Applied: {title} in {location}",
-                            body=f"Your bot applied to the job:\n\nTitle: {title}\nLocation: {location}\nLink: {link}\nTime: {job['timestamp']}"
-                        )
-                    except Exception as app_error:
-                        print(f"⚠️ Failed to apply: {app_error}")
                         send_email(
-                            subject="❗ Job Application Failed",
-                            body=f"Bot found a job, but failed to apply:\n\n{app_error}"
+                            subject="❗ Bot Error Alert",
+                            body=f"An error occurred:\n\n{e}"
                         )
-                else:
-                    print(f"❌ Job doesn't match preferred cities or already seen: {title} - {location}")
-
-        except Exception as e:
-            print(f"⚠️ Error occurred: {e}")
-            try:
-                send_email(
-                    subject="❗ Bot Error Alert",
-                    body=f"An error occurred:\n\n{e}"
-                )
-            except:
-                print("❌ Failed to send error email.")
-
-            await asyncio.sleep(5)  # wait before retry
-
-        # 🔁 Wait between 0 to 3 seconds before checking again
-        await wait_random(0, 3)
-
-    await browser.close()
+                    except:
+                        print("❌ Failed to send error email.")
+
+                try:
+                    await session.checkpoint()
+                except Exception as e:
+                    print(f"⚠️ Could not recycle scan session: {e}")
+
+                # 🔁 Tighter after new jobs, backs off on empty or failed polls
+                delay = scheduler.record(new_count, error=failed)
+                print(f"⏲️ Next check in {delay:.1f}s: {scheduler.describe()}")
+                try:
+                    await asyncio.wait_for(stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        await pipeline.close()
+        await close_pool()
+        await close_writer()
 
 if __name__ == "__main__":
-    asyncio.run(monitor_jobs())
+    # Through the daemon, so .env is loaded and checked before anything runs
+    import daemon
+    daemon.main(["monitor"])
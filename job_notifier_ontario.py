@@ -1,25 +1,22 @@
+import asyncio
 import os
 import time
-import random
 import requests
-from dotenv import load_dotenv
-from notifier import send_email
-
-# ─── Load creds and token ──────────────────────────────────────────────────────
-load_dotenv()
-SENDER_EMAIL   = os.getenv("SENDER_EMAIL")
-SENDER_PASS    = os.getenv("SENDER_PASS")
-RECEIVER_EMAIL = os.getenv("RECEIVER_EMAIL")
-AUTH_TOKEN     = os.getenv("AMAZON_AUTH_TOKEN")
-GRAPHQL_URL    = os.getenv(
-    "AMAZON_GRAPHQL_URL",
-    "https://e5mquma77feepi2bdn4d6h3mpu.appsync-api.us-east-1.amazonaws.com/graphql"
-)
-
-if not (SENDER_EMAIL and SENDER_PASS and RECEIVER_EMAIL):
-    raise RuntimeError("Missing SENDER_EMAIL, SENDER_PASS or RECEIVER_EMAIL in .env")
-if not AUTH_TOKEN:
-    raise RuntimeError("Missing AMAZON_AUTH_TOKEN in .env")
+import requests.adapters
+from config import HIRING_BASE_URL, RETRY_BUDGETS
+from notifier import send_email, digest, DIGEST_MODE
+from seen_store import open_seen_store
+import metrics
+from job_cards import parse_cards, card_link, card_pay
+from scheduler import PollScheduler
+from subscribers import load_registry
+from job_record import Job
+from card_diff import CardDiffer, ADDED, CHANGED, REMOVED
+from resilience import GuardedFetch, PermanentError, retry
+from search_query import plan_searches
+
+# ─── Endpoint; creds and token are read when used (daemon.py loads and checks .env) ──
+DEFAULT_GRAPHQL_URL = "https://e5mquma77feepi2bdn4d6h3mpu.appsync-api.us-east-1.amazonaws.com/graphql"
 
 # ─── The exact query your browser sends ────────────────────────────────────────
 SEARCH_QUERY = r"""
@@ -38,7 +35,35 @@ query searchJobCardsByLocation($searchJobRequest: SearchJobRequest!) {
 }
 """
 
-def fetch_jobs():
+# ─── Paging / connection settings ─────────────────────────────────────────────
+PAGE_SIZE         = 100
+FETCH_CONCURRENCY = 4      # pages in flight at once, across all regions
+MAX_PAGES         = 200    # per region; hard stop so a bad response can't page forever
+REQUEST_TIMEOUT   = 15     # seconds, per page attempt
+
+_session = None
+
+def get_session():
+    """One keep-alive session: TCP/TLS is set up once and reused across polls."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_CONCURRENCY)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _session.headers.update({
+          "Content-Type":    "application/json",
+          "Accept":          "*/*",
+          "Accept-Encoding": "gzip, deflate",
+          "Origin":          HIRING_BASE_URL,
+          "Referer":         f"{HIRING_BASE_URL}/",
+          "authorization":   f"Bearer {os.getenv('AMAZON_AUTH_TOKEN')}",
+          "country":         "Canada",
+          "iscanary":        "false"
+        })
+    return _session
+
+def build_payload(offset=0, page_size=PAGE_SIZE, filters=None):
     payload = {
       "operationName": "searchJobCardsByLocation",
       "query": SEARCH_QUERY,
@@ -48,8 +73,8 @@ def fetch_jobs():
           "country":      "Canada",
           "keyWords":     "warehouse",
           "equalFilters": [],
-          "offset":       0,
-          "pageSize":     100,
+          "offset":       offset,
+          "pageSize":     page_size,
           "distance":     None,
           "postalCode":   None,
           "sortBy":       None,
@@ -57,101 +82,217 @@ def fetch_jobs():
         }
       }
     }
-    headers = {
-      "Content-Type":  "application/json",
-      "Accept":        "*/*",
-      "Origin":        "https://hiring.amazon.ca",
-      "Referer":       "https://hiring.amazon.ca/",
-      "authorization": f"Bearer {AUTH_TOKEN}",
-      "country":       "Canada",
-      "iscanary":      "false"
-    }
+    # Region (postalCode/distance or mapBounds) and equalFilters from search_query
+    payload["variables"]["searchJobRequest"].update(filters or {})
+    return payload
+
+class FetchError(Exception):
+    """A page could not be fetched or parsed, so this poll has no complete result."""
 
-    resp = requests.post(GRAPHQL_URL, json=payload, headers=headers)
+def _is_auth_error(js):
+    errors = js.get("errors") if isinstance(js, dict) else None
+    return any("Unauthorized" in str(e) for e in errors or [])
+
+def fetch_page(offset, filters=None):
+    with metrics.timed("graphql_fetch"):
+        resp = get_session().post(os.getenv("AMAZON_GRAPHQL_URL", DEFAULT_GRAPHQL_URL), json=build_payload(offset, filters=filters), timeout=REQUEST_TIMEOUT)
+    if resp.status_code in (401, 403):
+        # Retrying an expired token only burns budget; let the breaker open straight away
+        raise PermanentError(f"HTTP {resp.status_code}, is AMAZON_AUTH_TOKEN expired? {resp.text[:200]}")
     try:
         resp.raise_for_status()
-    except Exception as e:
-        print("❌ HTTP error:", e, resp.text)
-        return []
+    except requests.HTTPError as e:
+        raise FetchError(f"HTTP error: {e} {resp.text[:200]}")
 
     try:
         js = resp.json()
     except ValueError as e:
-        print("❌ Failed to parse JSON:", e, resp.text)
-        return []
+        raise FetchError(f"Failed to parse JSON: {e} {resp.text[:200]}")
 
-    # drill down safely
-    data = js.get("data")
-    if not isinstance(data, dict):
-        print("⚠️ No `data` in GraphQL response:", js)
-        return []
-    response = data.get("searchJobCardsByLocation")
-    if not isinstance(response, dict):
-        print("⚠️ No `searchJobCardsByLocation` in data:", js)
-        return []
-    cards = response.get("jobCards")
-    if not isinstance(cards, list):
-        print("⚠️ `jobCards` is not a list:", js)
+    if _is_auth_error(js):
+        raise PermanentError(f"GraphQL rejected the token, is AMAZON_AUTH_TOKEN expired? {js['errors']}")
+    cards = parse_cards(js)
+    if cards is None:
+        raise FetchError("Unexpected GraphQL response shape")
+    return cards
+
+async def _fetch_page_async(offset, filters, limit):
+    async with limit:
+        return await retry(
+            lambda: asyncio.wait_for(asyncio.to_thread(fetch_page, offset, filters), REQUEST_TIMEOUT),
+            "graphql_page", **RETRY_BUDGETS["graphql_page"]
+        )
+
+async def _fetch_region(filters, limit):
+    first = await _fetch_page_async(0, filters, limit)
+    if not first:
         return []
+    pages = [first]
 
+    # A full page means there may be more: walk the rest in concurrent windows
+    offset = PAGE_SIZE
+    more = len(first) == PAGE_SIZE
+    while more and len(pages) < MAX_PAGES:
+        window = [offset + i * PAGE_SIZE for i in range(FETCH_CONCURRENCY)]
+        offset += FETCH_CONCURRENCY * PAGE_SIZE
+        # Any page that still fails after its retries fails the whole poll: a partial
+        # listing would read as "removed" to the differ
+        for page in await asyncio.gather(*(_fetch_page_async(o, filters, limit) for o in window)):
+            if page:
+                pages.append(page)
+            if len(page) < PAGE_SIZE:
+                more = False
+                break
+    return [c for page in pages for c in page]
+
+async def fetch_jobs_async(searches=None):
+    searches = searches or plan_searches()
+    limit = asyncio.Semaphore(FETCH_CONCURRENCY)
+    # A failed region fails the poll, same as a failed page
+    regions = await asyncio.gather(*(_fetch_region(filters, limit) for _, filters in searches))
+
+    # Regions overlap and listings can shift between page requests, so drop repeats
+    cards, ids = [], set()
+    for (name, _), region in zip(searches, regions):
+        metrics.inc(f"graphql_cards_{name}", len(region))
+        for c in region:
+            jid = c.get("jobId")
+            if jid in ids:
+                continue
+            ids.add(jid)
+            cards.append(c)
     return cards
 
+def fetch_jobs(searches=None):
+    return asyncio.run(fetch_jobs_async(searches))
+
+_graphql = GuardedFetch("graphql")
+
+def fetch_snapshot(searches=None):
+    """(cards, stale): a fresh listing, or the last good one while the endpoint is failing."""
+    return asyncio.run(_graphql.fetch(lambda: fetch_jobs_async(searches)))
+
+def format_card(c, changes=None):
+    jid      = c.get("jobId")
+    title    = c.get("jobTitle",            "N/A")
+    location = c.get("locationName",        "N/A")
+    shifts   = c.get("scheduleCount",       "N/A")
+    emp_type = c.get("employmentTypeL10N",  "N/A")
+    pay      = card_pay(c)
+    link     = card_link(jid)
+
+    lines = ["-------------------------------"]
+    if changes:
+        lines += changes
+        lines.append("-------------------------------")
+    lines += [
+        f"Shifts:   {shifts}",
+        f"Location: {location}",
+        f"Type:     {emp_type}",
+        f"Pay:      {pay}",
+        f"Job:      {title}",
+        f"Link:     {link}",
+        "-------------------------------",
+    ]
+    return "\n".join(lines)
+
+def deliver(outbox):
+    """One SMTP message per alert (or one digest per subscriber), all over the shared connection."""
+    for sub, alerts in outbox.values():
+        if sub.channel != "email":
+            print(f"⚠️ Channel '{sub.channel}' not supported, skipping {sub.name}")
+            continue
+        with digest("🔔 New Ontario Jobs", enabled=DIGEST_MODE):
+            for subject, body, jid in alerts:
+                send_email(subject=subject, body=body, job_ids=[jid], to=sub.emails)
+        print(f"📧 {len(alerts)} alert(s) queued for {sub.name}")
+
 def main():
-    seen = set()
+    metrics.start_exporters()
+    seen = open_seen_store("ontario")
+    registry = load_registry(os.getenv("RECEIVER_EMAIL"))
+    differ = CardDiffer()
+    scheduler = PollScheduler.for_monitor("ontario", seen)
+    # An empty store's first poll is the standing backlog, not arrivals: keep it out of the histogram
+    backlog = len(seen) == 0
     print("🔍 Monitoring Ontario warehouse jobs via GraphQL…")
+    searches = plan_searches(registry)
+    print(f"🗺️ Searching: {', '.join(name for name, _ in searches)}")
 
     # SMTP smoke-test
     try:
         send_email("🔥 TEST ALERT", "GraphQL notifier is running.")
-        print("📧 Test alert sent.")
+        print("📧 Test alert queued.")
     except Exception as e:
         print("❌ SMTP test failed:", e)
 
     while True:
+        new_count, failed = 0, False
         try:
-            cards = fetch_jobs()
+            cards, failed = fetch_snapshot(searches)
             if not cards:
+                # Don't diff an empty/failed poll, it would report every card as removed
                 print("⏳ No new jobs right now.")
             else:
-                for c in cards:
-                    jid = c.get("jobId")
-                    if not jid or jid in seen:
+                # Keep still-listed postings alive; drop ones gone past the TTL
+                seen.touch([c.get("jobId") for c in cards if c.get("jobId")])
+                seen.evict_expired()
+
+                outbox = {}   # subscriber id -> (subscriber, [(subject, body, job_id)])
+                for event in differ.diff(cards):
+                    c        = event.card
+                    jid      = event.job_id
+                    title    = c.get("jobTitle",     "N/A")
+                    location = c.get("locationName", "N/A")
+
+                    if event.kind == REMOVED:
+                        print(f"🗑️ Posting closed: {title} @ {location}")
                         continue
-                    seen.add(jid)
-
-                    title    = c.get("jobTitle",            "N/A")
-                    location = c.get("locationName",        "N/A")
-                    shifts   = c.get("scheduleCount",       "N/A")
-                    emp_type = c.get("employmentTypeL10N",  "N/A")
-                    pm       = c.get("totalPayRateMinL10N", "")
-                    px       = c.get("totalPayRateMaxL10N", "")
-                    pay      = f"{pm} – {px}" if pm and px else (pm or px or "N/A")
-
-                    link = (
-                        f"https://hiring.amazon.ca/app#/jobSearch?"
-                        f"jobId={jid}&locale=en-CA"
-                    )
-
-                    body = "\n".join([
-                        "-------------------------------",
-                        f"Shifts:   {shifts}",
-                        f"Location: {location}",
-                        f"Type:     {emp_type}",
-                        f"Pay:      {pay}",
-                        f"Job:      {title}",
-                        f"Link:     {link}",
-                        "-------------------------------",
-                    ])
-                    send_email(
-                        subject=f"🔔 New Ontario Job: {title} @ {location}",
-                        body=body
-                    )
-                    print(f"📧 Alert sent for: {title} @ {location}")
+
+                    if jid not in seen:
+                        arrival = event.kind == ADDED and not backlog
+                        seen.add(jid, arrival=arrival)
+                        if arrival:
+                            new_count += 1
+                        metrics.job_detected(jid)
+                    elif event.kind == ADDED and not seen.notified(jid):
+                        # Seen before subscribers were tracked (or matched nobody): don't re-alert on restart
+                        continue
+
+                    job     = Job.from_card(c)
+                    already = seen.notified(jid)
+                    fresh   = 0
+                    changes = [
+                        f"Changed:  {f}: {event.previous.get(f)} → {c.get(f)}"
+                        for f in event.fields
+                    ]
+                    for sub in registry.match(job):
+                        if not already & sub.bit:
+                            # First time this subscriber qualifies, even if the card itself is old
+                            fresh |= sub.bit
+                            alert = (f"🔔 New Ontario Job: {title} @ {location}", format_card(c), jid)
+                        elif event.kind == CHANGED:
+                            alert = (f"✏️ Updated Ontario Job: {title} @ {location}", format_card(c, changes), jid)
+                        else:
+                            continue
+                        outbox.setdefault(sub.id, (sub, []))[1].append(alert)
+                    seen.mark_notified(jid, fresh)
+
+                deliver(outbox)
+                if not failed:
+                    backlog = False
 
         except Exception as e:
+            failed = True
             print("⚠️ Error fetching/sending:", e)
 
-        time.sleep(random.uniform(30, 60))
+        delay = scheduler.record(new_count, error=failed)
+        print(f"⏲️ Next poll in {delay:.0f}s: {scheduler.describe()}")
+        if failed:
+            print(f"🔌 GraphQL breaker: {_graphql.breaker.describe()}")
+        time.sleep(delay)
 
 if __name__ == "__main__":
-    main()
+    # Through the daemon, so .env is loaded and checked before anything runs
+    import daemon
+    daemon.main(["notify"])
@@ -0,0 +1,102 @@
+# job_record.py
+
+import re
+import sys
+import time
+from datetime import datetime
+from config import USER_DETAILS
+from job_cards import card_link
+
+
+class Job:
+    """One job posting, whichever source it came from (GraphQL card or scraped tile)."""
+
+    __slots__ = (
+        "job_id", "title", "location", "link",
+        "schedule_count", "employment_type", "pay_min", "pay_max",
+        "seen_at", "seen_wall",
+    )
+
+    def __init__(self, job_id, title, location, link,
+                 schedule_count=None, employment_type=None, pay_min=None, pay_max=None):
+        self.job_id = job_id
+        self.title = title
+        # Few distinct locations across thousands of postings: share one string each
+        self.location = sys.intern(location)
+        self.link = link
+        self.schedule_count = schedule_count
+        self.employment_type = employment_type
+        self.pay_min = pay_min
+        self.pay_max = pay_max
+        self.seen_at = time.monotonic()    # for latency math
+        self.seen_wall = time.time()       # for humans, formatted on demand
+
+    @classmethod
+    def from_card(cls, card):
+        job_id = card.get("jobId")
+        return cls(
+            job_id=job_id,
+            title=card.get("jobTitle") or "No title",
+            location=card.get("locationName") or "No location",
+            link=card_link(job_id),
+            schedule_count=card.get("scheduleCount"),
+            employment_type=card.get("employmentTypeL10N"),
+            pay_min=card.get("totalPayRateMinL10N") or None,
+            pay_max=card.get("totalPayRateMaxL10N") or None,
+        )
+
+    @classmethod
+    def from_tile(cls, tile, job_id=None):
+        return cls(
+            job_id=job_id,
+            title=tile.get("title") or "No title",
+            location=tile.get("location") or "No location",
+            link=tile.get("link") or "No link",
+        )
+
+    @property
+    def key(self):
+        # Scraped hiring.amazon.ca tiles have no ID, only a link
+        return self.job_id or self.link
+
+    @property
+    def pay(self):
+        pm, px = self.pay_min, self.pay_max
+        return f"{pm} – {px}" if pm and px else (pm or px or "N/A")
+
+    @property
+    def timestamp(self):
+        return str(datetime.fromtimestamp(self.seen_wall))
+
+    def get(self, name, default=None):
+        # Lets CardDiffer treat Job and raw card dicts the same way
+        return getattr(self, name, default)
+
+    def to_record(self, user_email):
+        return {
+            "user_email": user_email,
+            "job_id": self.key,
+            "title": self.title,
+            "location": self.location,
+            "applied_at": self.timestamp,
+        }
+
+    def __repr__(self):
+        return f"Job({self.key!r}, {self.title!r}, {self.location!r})"
+
+
+class LocationMatcher:
+    """Case-insensitive "any preferred city appears in the location" test, compiled once."""
+
+    def __init__(self, cities):
+        self.pattern = re.compile("|".join(re.escape(c) for c in cities), re.IGNORECASE)
+        self._cache = {}   # interned location -> bool
+
+    def matches(self, location):
+        hit = self._cache.get(location)
+        if hit is None:
+            hit = self._cache[location] = self.pattern.search(location) is not None
+        return hit
+
+
+PREFERRED_LOCATIONS = LocationMatcher(USER_DETAILS["preferred_cities"])
@@ -2,14 +2,25 @@
 import asyncio
 from job_checker import get_new_jobs
 from apply import apply_to_job
+from browser_pool import get_pool, close_pool
+from persistence import close_writer
 
-async def main():
-    new_jobs = await get_new_jobs()
+async def scan_and_apply(pool):
+    new_jobs = await get_new_jobs(pool)
     if not new_jobs:
         print("🟡 No new jobs found.")
         return
 
-    for job in new_jobs:
-        await apply_to_job(job)
+    # Leases block once every context is busy, so this is bounded by the pool size
+    await asyncio.gather(*(apply_to_job(job, pool) for job in new_jobs))
+
+async def main():
+    pool = await get_pool()
+    try:
+        await scan_and_apply(pool)
+    finally:
+        await close_pool()
+        await close_writer()
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,247 @@
+# metrics.py
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import METRICS_PORT, METRICS_JSONL_PATH, METRICS_FLUSH_SECONDS, METRICS_JSONL_MAX_BYTES
+
+# Seconds; covers a cached dedupe hit (sub-ms) up to a slow application (minutes)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+
+
+class Counter:
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.values = {}
+
+    def inc(self, key, amount=1):
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{{{self.label}="{key}"}} {value}')
+        return lines
+
+    def snapshot(self):
+        with _lock:
+            return dict(self.values)
+
+
+class Gauge:
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.values = {}
+
+    def set(self, key, value):
+        with _lock:
+            self.values[key] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with _lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{{{self.label}="{key}"}} {value}')
+        return lines
+
+    def snapshot(self):
+        with _lock:
+            return dict(self.values)
+
+
+class Histogram:
+    def __init__(self, name, help_text, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self.series = {}   # key -> [bucket counts..., +Inf count], sum
+
+    def observe(self, key, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{self.label}="{key}",le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{self.label}="{key}",le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{self.label}="{key}"}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{self.label}="{key}"}} {cumulative}')
+        return lines
+
+    def snapshot(self):
+        with _lock:
+            return {
+                key: {"count": sum(counts), "sum": round(total, 6)}
+                for key, (counts, total) in self.series.items()
+            }
+
+
+STAGE_SECONDS = Histogram("amazon_bot_stage_seconds", "Time spent per pipeline stage.", "stage")
+STAGE_ERRORS = Counter("amazon_bot_stage_errors_total", "Stage calls that raised.", "stage")
+EVENTS = Counter("amazon_bot_events_total", "Discrete bot events.", "event")
+DETECT_TO_ACTION = Histogram(
+    "amazon_bot_detect_to_action_seconds",
+    "Time from first seeing a jobId to the alert being sent or the application submitted.",
+    "action",
+)
+MEMORY_MB = Gauge("amazon_bot_memory_mb", "Last sampled memory (MB): python RSS, browser RSS, page JS heap.", "process")
+BREAKER_STATE = Gauge("amazon_bot_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", "breaker")
+
+REGISTRY = (STAGE_SECONDS, STAGE_ERRORS, EVENTS, DETECT_TO_ACTION, BREAKER_STATE, MEMORY_MB)
+
+
+def observe(stage, seconds):
+    STAGE_SECONDS.observe(stage, seconds)
+
+
+def inc(event, amount=1):
+    EVENTS.inc(event, amount)
+
+
+@contextmanager
+def timed(stage):
+    """Time a block (sync or inside a coroutine) into STAGE_SECONDS."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(stage, time.perf_counter() - start)
+
+
+# --- Detection-to-action latency (the headline metric) ---
+_MAX_PENDING = 10000
+_first_seen = OrderedDict()
+
+
+def job_detected(job_id):
+    with _lock:
+        if job_id in _first_seen:
+            return
+        _first_seen[job_id] = time.monotonic()
+        if len(_first_seen) > _MAX_PENDING:
+            _first_seen.popitem(last=False)
+
+
+def job_actioned(job_id, action, detected_at=None):
+    """Record detection -> `action` ("alert" / "apply") latency.
+
+    `detected_at` is a time.monotonic() stamp such as Job.seen_at; without it the
+    job must have been registered with job_detected.
+    """
+    start = detected_at
+    if start is None:
+        with _lock:
+            start = _first_seen.get(job_id)
+    if start is not None:
+        DETECT_TO_ACTION.observe(action, time.monotonic() - start)
+
+
+def job_finished(job_id):
+    with _lock:
+        _first_seen.pop(job_id, None)
+
+
+# --- Exposition ---
+def render_prometheus():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    return {
+        "ts": time.time(),
+        "stages": STAGE_SECONDS.snapshot(),
+        "errors": STAGE_ERRORS.snapshot(),
+        "events": EVENTS.snapshot(),
+        "detect_to_action": DETECT_TO_ACTION.snapshot(),
+        "breakers": BREAKER_STATE.snapshot(),
+        "memory_mb": MEMORY_MB.snapshot(),
+    }
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_jsonl(path, max_bytes):
+    try:
+        if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            os.replace(path, path + ".1")
+        with open(path, "a") as f:
+            f.write(json.dumps(snapshot()) + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not write metrics file: {e}")
+
+
+def _jsonl_loop(path, interval, max_bytes):
+    while True:
+        time.sleep(interval)
+        _write_jsonl(path, max_bytes)
+
+
+_exporters_started = False
+
+
+def start_exporters(port=METRICS_PORT, path=METRICS_JSONL_PATH):
+    """Serve /metrics on localhost and append a snapshot to the JSONL file every flush interval."""
+    global _exporters_started
+    if _exporters_started:
+        return
+    _exporters_started = True
+
+    if port:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"📈 Metrics on http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint not started: {e}")
+    if path:
+        atexit.register(_write_jsonl, path, METRICS_JSONL_MAX_BYTES)
+        threading.Thread(
+            target=_jsonl_loop, args=(path, METRICS_FLUSH_SECONDS, METRICS_JSONL_MAX_BYTES),
+            name="metrics-jsonl", daemon=True
+        ).start()
@@ -1,32 +1,157 @@
+import atexit
+import queue
 import smtplib
+import threading
+import time
+from contextlib import contextmanager
 from email.message import EmailMessage
-from dotenv import load_dotenv
 import os
+import metrics
 
-load_dotenv()
+# Credentials are read when used, not at import: daemon.py loads .env and validates it first
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "1") == "1"   # the local benchmark sink speaks plain SMTP
+SEND_ATTEMPTS = 2
 
-SENDER_EMAIL = os.getenv("SENDER_EMAIL")
-SENDER_PASS = os.getenv("SENDER_PASS")
-RECEIVER_EMAIL = os.getenv("RECEIVER_EMAIL")
+# Coalesce every alert from one poll into a single message
+DIGEST_MODE = os.getenv("NOTIFY_DIGEST", "0") == "1"
 
-def send_email(subject, body):
-    try:
-        # Split RECEIVER_EMAIL by comma to get a list of recipients
-        receiver_emails = [email.strip() for email in RECEIVER_EMAIL.split(",")]
 
-        # Create the email message
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = SENDER_EMAIL
-        msg["To"] = ", ".join(receiver_emails)  # Join the list into a comma-separated string
-        msg.set_content(body)
+# --- Persistent SMTP connection ---
+class SMTPConnection:
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT):
+        self.host = host
+        self.port = port
+        self._smtp = None
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if SMTP_USE_SSL else smtplib.SMTP
+        self._smtp = smtp_class(self.host, self.port)
+        self._smtp.login(os.getenv("SENDER_EMAIL"), os.getenv("SENDER_PASS"))
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def send(self, msg):
+        for attempt in range(SEND_ATTEMPTS):
+            try:
+                if self._smtp is None:
+                    self._connect()
+                self._smtp.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPSenderRefused, OSError):
+                # Gmail drops idle sessions; reconnect and try once more
+                self.close()
+                if attempt == SEND_ATTEMPTS - 1:
+                    raise
+
+
+# --- Background sender fed by a queue ---
+class EmailSender:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._conn = SMTPConnection()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="email-sender", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, msg, job_ids=()):
+        self._ensure_started()
+        self._queue.put((time.monotonic(), msg, job_ids))
+
+    def _run(self):
+        while True:
+            queued_at, msg, job_ids = self._queue.get()
+            try:
+                with metrics.timed("smtp_send"):
+                    self._conn.send(msg)
+                latency = time.monotonic() - queued_at
+                metrics.observe("email_queue_to_sent", latency)
+                metrics.inc("emails_sent")
+                for job_id in job_ids:
+                    metrics.job_actioned(job_id, "alert")
+                print(f"📧 Email sent to: {msg['To']} ({latency:.2f}s after enqueue)")
+            except Exception as e:
+                metrics.inc("emails_failed")
+                print(f"❌ Failed to send email: {e}")
+            finally:
+                for job_id in job_ids:
+                    metrics.job_finished(job_id)
+                self._queue.task_done()
+
+    def flush(self, timeout=None):
+        """Block until every queued message has been handed to SMTP (or timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
 
-        # Connect to SMTP server and send the email
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(SENDER_EMAIL, SENDER_PASS)
-            smtp.send_message(msg)
+_sender = EmailSender()
+_digest = None
 
-        print(f"📧 Email sent to: {', '.join(receiver_emails)}")
+atexit.register(_sender.flush, 30)
 
+
+def _build_message(subject, body, to=None):
+    # Split RECEIVER_EMAIL by comma to get a list of recipients
+    receiver_emails = to or [email.strip() for email in os.getenv("RECEIVER_EMAIL", "").split(",")]
+
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = os.getenv("SENDER_EMAIL")
+    msg["To"] = ", ".join(receiver_emails)  # Join the list into a comma-separated string
+    msg.set_content(body)
+    return msg
+
+
+def send_email(subject, body, job_ids=(), to=None):
+    """Queue an email for the background sender and return immediately."""
+    try:
+        if _digest is not None:
+            _digest.append((subject, body, job_ids, to))
+            return
+        _sender.enqueue(_build_message(subject, body, to), job_ids)
     except Exception as e:
-        print(f"❌ Failed to send email: {e}")
+        print(f"❌ Failed to queue email: {e}")
+
+
+def flush_emails(timeout=None):
+    return _sender.flush(timeout)
+
+
+@contextmanager
+def digest(title, enabled=True):
+    """Collect send_email calls inside the block and send them as one message."""
+    global _digest
+    if not enabled or _digest is not None:
+        yield
+        return
+
+    _digest = []
+    try:
+        yield
+    finally:
+        items, _digest = _digest, None
+        if len(items) == 1:
+            send_email(*items[0])
+        elif items:
+            # A digest block is expected to target one set of recipients
+            body = "\n\n".join(f"{subject}\n{body}" for subject, body, _, _ in items)
+            job_ids = [job_id for _, _, ids, _ in items for job_id in ids]
+            send_email(f"{title} ({len(items)})", body, job_ids, items[0][3])
@@ -0,0 +1,153 @@
+# persistence.py
+
+import asyncio
+import json
+import os
+import pymongo
+import metrics
+from config import APPLY_JOURNAL_PATH, APPLY_FLUSH_BATCH, APPLY_FLUSH_SECONDS
+from db import get_collection, ensure_indexes, mark_applied
+
+DUPLICATE_KEY = 11000
+MAX_RETRY_DELAY = 300
+
+
+class ApplicationWriter:
+    """Write-behind for applied-job records.
+
+    record() appends to a local JSONL journal and returns; a background task
+    batches records into Mongo with insert_many on a worker thread. The journal
+    only ever holds records Mongo hasn't confirmed, and is replayed on start.
+    """
+
+    def __init__(self, journal_path=APPLY_JOURNAL_PATH, batch_size=APPLY_FLUSH_BATCH,
+                 flush_seconds=APPLY_FLUSH_SECONDS):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending = []
+        self._wake = asyncio.Event()
+        self._task = None
+        self._journal = None
+
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._pending.append(json.loads(line))
+                except ValueError:
+                    # Torn final line from a crash mid-write
+                    print(f"⚠️ Skipping corrupt journal line: {line[:80]}")
+        if self._pending:
+            metrics.inc("journal_replayed", len(self._pending))
+            print(f"📒 Replaying {len(self._pending)} unsaved applications from {self.journal_path}.")
+            for doc in self._pending:
+                mark_applied(doc["job_id"])
+
+    def start(self):
+        if self._task is None:
+            self._replay()
+            self._journal = open(self.journal_path, "a")
+            self._task = asyncio.create_task(self._flush_loop(), name="mongo-write-behind")
+        return self
+
+    def record(self, doc):
+        """Durably queue one application record; never touches the network."""
+        self._journal.write(json.dumps(doc) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending.append(doc)
+        mark_applied(doc["job_id"])
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def _insert(self, docs):
+        ensure_indexes()
+        try:
+            with metrics.timed("mongo_insert"):
+                # Copies: insert_many adds _id to the dicts it is given
+                get_collection().insert_many([dict(d) for d in docs], ordered=False)
+        except pymongo.errors.BulkWriteError as e:
+            # Already-recorded jobs are fine; anything else is a real failure
+            if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                raise
+
+    def _rewrite_journal(self):
+        # Keep only what is still unconfirmed; atomic swap so a crash leaves one valid file
+        self._journal.close()
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w") as f:
+            for doc in self._pending:
+                f.write(json.dumps(doc) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_path)
+        self._journal = open(self.journal_path, "a")
+
+    async def flush(self):
+        if not self._pending:
+            return True
+        batch = self._pending[:self.batch_size]
+        try:
+            await asyncio.to_thread(self._insert, batch)
+        except Exception as e:
+            metrics.inc("mongo_flush_failed")
+            print(f"⚠️ Mongo write failed, {len(self._pending)} records kept in journal: {e}")
+            return False
+        del self._pending[:len(batch)]
+        self._rewrite_journal()
+        print(f"💾 Saved {len(batch)} application(s) to MongoDB.")
+        return True
+
+    async def _flush_loop(self):
+        delay = self.flush_seconds
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            ok = await self.flush()
+            while ok and len(self._pending) >= self.batch_size:
+                ok = await self.flush()
+            # Back off while Atlas is unreachable; the journal holds everything meanwhile
+            delay = self.flush_seconds if ok else min(delay * 2, MAX_RETRY_DELAY)
+
+    async def close(self, timeout=30):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            while self._pending and await asyncio.wait_for(self.flush(), timeout):
+                pass
+        except asyncio.TimeoutError:
+            print("⚠️ Final Mongo flush timed out; records stay in the journal.")
+        if self._pending:
+            print(f"📒 {len(self._pending)} application(s) left in {self.journal_path} for next start.")
+        self._journal.close()
+
+
+# --- Process-wide shared writer ---
+_writer = None
+
+
+def get_writer() -> ApplicationWriter:
+    global _writer
+    if _writer is None:
+        _writer = ApplicationWriter()
+    return _writer.start()
+
+
+async def close_writer():
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
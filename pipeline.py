@@ -0,0 +1,131 @@
+# pipeline.py
+
+import asyncio
+from config import APPLY_WORKERS, APPLY_QUEUE_SIZE, NOTIFY_QUEUE_SIZE
+from apply import apply_to_job, retry_after, BREAKER_OPEN
+from form_flow import SUBMITTED
+from notifier import send_email
+import metrics
+
+_STOP = object()
+MAX_DEFERS = 12              # breaker windows a job waits out before it is reported as failed
+
+
+class JobPipeline:
+    """discovery -> [apply queue] -> apply workers -> [notify queue] -> notifier worker"""
+
+    def __init__(self, pool, apply_workers=APPLY_WORKERS,
+                 apply_queue_size=APPLY_QUEUE_SIZE, notify_queue_size=NOTIFY_QUEUE_SIZE):
+        self.pool = pool
+        self.apply_workers = apply_workers
+        self.apply_queue = asyncio.Queue(apply_queue_size)
+        self.notify_queue = asyncio.Queue(notify_queue_size)
+        self._tasks = []
+        self._deferred = set()   # sleeping tasks that will requeue a job
+        self._defers = {}        # job key -> times deferred
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._apply_worker(i), name=f"apply-{i}")
+            for i in range(self.apply_workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._notify_worker(), name="notify"))
+        print(f"🧵 Pipeline started with {self.apply_workers} apply workers.")
+        return self
+
+    async def submit(self, job):
+        # Apply latency runs from job.seen_at; this registers the job for the email alerts
+        metrics.job_detected(job.key)
+        # Blocks only when the apply queue is full: that's the backpressure on discovery
+        await self.apply_queue.put(job)
+
+    async def notify(self, subject, body, job_ids=()):
+        await self.notify_queue.put((subject, body, job_ids))
+
+    async def _apply_worker(self, n):
+        while True:
+            job = await self.apply_queue.get()
+            try:
+                if job is _STOP:
+                    return
+                title, location, link, key = job.title, job.location, job.link, job.key
+                try:
+                    with metrics.timed("apply"):
+                        status = await apply_to_job(job, self.pool)
+                except Exception as e:
+                    status = f"error: {e}"
+
+                if status == BREAKER_OPEN and self._defer(job):
+                    continue
+                self._defers.pop(key, None)
+
+                if status == SUBMITTED:
+                    metrics.job_actioned(key, "apply", detected_at=job.seen_at)
+                    print(f"🚀 Applied to job: {title} in {location}")
+                    await self.notify(
+                        f"✅ Job Applied: {title} in {location}",
+                        f"Your bot applied to the job:\n\nTitle: {title}\nLocation: {location}\nLink: {link}\nTime: {job.timestamp}",
+                        [key]
+                    )
+                else:
+                    # apply_to_job returns None after logging its own error
+                    app_error = f"application not submitted ({status or 'error, see logs'})"
+                    print(f"⚠️ Failed to apply: {app_error}")
+                    await self.notify(
+                        "❗ Job Application Failed",
+                        f"Bot found a job, but failed to apply:\n\n{app_error}\n\nTitle: {title}\nLocation: {location}\nLink: {link}",
+                        [key]
+                    )
+            finally:
+                self.apply_queue.task_done()
+
+    def _defer(self, job):
+        """Requeue a job the apply breaker turned away once it lets applications through again."""
+        count = self._defers.get(job.key, 0) + 1
+        if count > MAX_DEFERS:
+            return False
+        self._defers[job.key] = count
+
+        async def requeue():
+            await asyncio.sleep(retry_after() + 1)
+            await self.apply_queue.put(job)
+
+        task = asyncio.create_task(requeue(), name=f"defer-{job.key}")
+        self._deferred.add(task)
+        task.add_done_callback(self._deferred.discard)
+        print(f"⏸️ Deferred {job.title} ({count}/{MAX_DEFERS}) until the apply breaker closes.")
+        return True
+
+    async def _notify_worker(self):
+        while True:
+            item = await self.notify_queue.get()
+            try:
+                if item is _STOP:
+                    return
+                subject, body, job_ids = item
+                send_email(subject=subject, body=body, job_ids=job_ids)
+            finally:
+                self.notify_queue.task_done()
+
+    async def close(self, timeout=120):
+        """Stop taking work, let queued jobs finish (up to timeout), then stop workers."""
+        if not self._tasks:
+            return
+        print(f"🧵 Draining pipeline ({self.apply_queue.qsize()} jobs queued)...")
+        if self._deferred:
+            print(f"⚠️ Dropping {len(self._deferred)} job(s) deferred by the apply breaker.")
+            for task in list(self._deferred):
+                task.cancel()
+        try:
+            for _ in range(self.apply_workers):
+                await self.apply_queue.put(_STOP)
+            await asyncio.wait_for(self.apply_queue.join(), timeout)
+            await self.notify_queue.put(_STOP)
+            await asyncio.wait_for(self.notify_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ Pipeline drain timed out, dropping remaining work.")
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
@@ -0,0 +1,77 @@
+# readiness.py
+
+import time
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
+import metrics
+
+# Per-step deadlines (ms): how long each step may wait for the thing it needs
+STEP_DEADLINES = {
+    "search_tiles": 15000,
+    "search_response": 20000,
+    "apply_button": 10000,
+    "form_field": 8000,
+    "submit_button": 8000,
+    "submit_settled": 10000,
+}
+DEFAULT_DEADLINE = 10000
+
+# step -> {"count", "timeouts", "total_ms", "max_ms"}
+WAIT_STATS = {}
+
+
+def record_wait(step, elapsed_ms, timed_out=False):
+    metrics.observe(f"wait_{step}", elapsed_ms / 1000)
+    if timed_out:
+        metrics.inc(f"wait_timeout_{step}")
+    stats = WAIT_STATS.setdefault(step, {"count": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0})
+    stats["count"] += 1
+    stats["timeouts"] += int(timed_out)
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+
+def format_wait_stats():
+    return ", ".join(
+        f"{step}: avg {s['total_ms'] / s['count']:.0f}ms, max {s['max_ms']:.0f}ms, {s['timeouts']} timeouts"
+        for step, s in WAIT_STATS.items()
+    ) or "no waits recorded"
+
+
+async def wait_ready(page: Page, step, selector, state="attached", timeout=None):
+    """Wait until `selector` reaches `state`; returns the element handle or None on deadline."""
+    timeout = timeout or STEP_DEADLINES.get(step, DEFAULT_DEADLINE)
+    start = time.monotonic()
+    try:
+        handle = await page.wait_for_selector(selector, state=state, timeout=timeout)
+        record_wait(step, (time.monotonic() - start) * 1000)
+        # wait_for_selector returns None for detached/hidden; report success as True
+        return handle if handle is not None else True
+    except PlaywrightTimeout:
+        record_wait(step, (time.monotonic() - start) * 1000, timed_out=True)
+        return None
+
+
+async def goto_ready(page: Page, url, step, selector, state="attached", timeout=None):
+    """Navigate and return as soon as `selector` is there, instead of waiting for networkidle."""
+    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    return await wait_ready(page, step, selector, state, timeout)
+
+
+async def goto_until_response(page: Page, url, step, match, timeout=None):
+    """Navigate and return the first response accepted by `match`, or None on deadline."""
+    timeout = timeout or STEP_DEADLINES.get(step, DEFAULT_DEADLINE)
+    start = time.monotonic()
+    try:
+        async with page.expect_response(match, timeout=timeout) as info:
+            if page.url == url:
+                # Already there: goto to the same "#/" URL is a fragment navigation that
+                # never refetches, so reload to make the page issue its request again
+                await page.reload(wait_until="commit", timeout=timeout)
+            else:
+                await page.goto(url, wait_until="commit", timeout=timeout)
+        response = await info.value
+        record_wait(step, (time.monotonic() - start) * 1000)
+        return response
+    except PlaywrightTimeout:
+        record_wait(step, (time.monotonic() - start) * 1000, timed_out=True)
+        return None
@@ -0,0 +1,129 @@
+# resilience.py
+
+import asyncio
+import random
+import time
+import metrics
+from config import BREAKERS, RETRY_BUDGETS
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class BreakerOpen(Exception):
+    """The breaker is open, so the call was not attempted."""
+
+
+class PermanentError(Exception):
+    """A failure retrying won't fix (e.g. 401 from an expired token); trips the breaker at once."""
+
+
+def describe_error(e):
+    """Readable text for an exception; timeouts and the like have an empty str()."""
+    return str(e) or type(e).__name__
+
+
+class CircuitBreaker:
+    """Closed -> open after `failures` consecutive failed calls; one probe is let through after `reset_seconds`."""
+
+    def __init__(self, name, failures, reset_seconds):
+        self.name = name
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        metrics.BREAKER_STATE.set(name, STATE_VALUES[CLOSED])
+
+    def _set(self, state, reason):
+        if state == self.state:
+            return
+        icon = {CLOSED: "🟢", HALF_OPEN: "🟡", OPEN: "🔴"}[state]
+        print(f"{icon} Breaker '{self.name}' {self.state} -> {state}: {reason}")
+        self.state = state
+        metrics.BREAKER_STATE.set(self.name, STATE_VALUES[state])
+        metrics.inc(f"breaker_{self.name}_{state}")
+
+    def allow(self):
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self._set(HALF_OPEN, "probing")
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._set(CLOSED, "call succeeded")
+
+    def record_failure(self, error, trip=False):
+        self.failures += 1
+        if trip or self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            self._set(OPEN, f"{self.failures} failure(s), last: {error}")
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a probe through (0 when it isn't open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.reset_seconds - (time.monotonic() - self.opened_at), 0.0)
+
+    def describe(self):
+        if self.state == OPEN:
+            return f"{self.state}, retry in {self.retry_in():.0f}s"
+        return f"{self.state}, {self.failures} recent failure(s)"
+
+
+async def retry(call, name, attempts, base, cap, deadline):
+    """Await `call()` until it succeeds, the attempts run out or `deadline` seconds pass.
+
+    Backoff is exponential with full jitter so parallel callers don't retry in lockstep.
+    """
+    end = time.monotonic() + deadline
+    for attempt in range(attempts):
+        try:
+            return await asyncio.wait_for(call(), max(end - time.monotonic(), 0))
+        except PermanentError:
+            raise
+        except Exception as e:
+            delay = random.uniform(0, min(cap, base * 2 ** attempt))
+            if attempt == attempts - 1 or time.monotonic() + delay >= end:
+                raise
+            metrics.inc(f"retry_{name}")
+            print(f"🔁 {name} failed ({describe_error(e)}), retry {attempt + 1}/{attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+class GuardedFetch:
+    """Retry budget + deadline + breaker around one kind of fetch, with the last good result as fallback."""
+
+    def __init__(self, name):
+        self.name = name
+        self.breaker = CircuitBreaker(name, **BREAKERS[name])
+        self.budget = RETRY_BUDGETS[name]
+        self.last_good = None
+        self.last_good_at = None
+
+    async def fetch(self, call):
+        """Return (result, stale). When stale, result is the last good snapshot (None if there is none yet)."""
+        if not self.breaker.allow():
+            return self._fallback(BreakerOpen(self.breaker.describe()))
+        try:
+            result = await retry(call, self.name, **self.budget)
+        except Exception as e:
+            self.breaker.record_failure(describe_error(e), trip=isinstance(e, PermanentError))
+            return self._fallback(e)
+
+        self.breaker.record_success()
+        # An empty result is not worth falling back to; the differ skips those anyway
+        if result:
+            self.last_good, self.last_good_at = result, time.monotonic()
+        return result, False
+
+    def _fallback(self, error):
+        metrics.inc(f"stale_{self.name}")
+        if self.last_good is None:
+            print(f"📦 {self.name}: {describe_error(error)}; no good snapshot to serve yet.")
+            return None, True
+        age = time.monotonic() - self.last_good_at
+        print(f"📦 {self.name}: {describe_error(error)}; serving last good snapshot ({age:.0f}s old).")
+        return self.last_good, True
@@ -0,0 +1,67 @@
+# scheduler.py
+
+import random
+import time
+from config import POLL_SCHEDULES
+
+BACKOFF_FACTOR = 1.5     # empty poll
+ERROR_FACTOR = 2.0       # failed poll
+JITTER = 0.2             # +/- fraction applied to every delay
+QUIET_BUSYNESS = 0.25    # hours below this share of the average arrival rate count as quiet
+MIN_HISTORY = 50         # arrivals needed before the hour-of-day history is trusted
+
+
+class PollScheduler:
+    """Picks the delay before the next poll from recent results and hour-of-day arrival history."""
+
+    def __init__(self, floor, base, ceiling, quiet_ceiling=None, arrivals=None):
+        self.floor = floor
+        self.base = base
+        self.ceiling = ceiling
+        self.quiet_ceiling = quiet_ceiling or ceiling
+        self.arrivals = list(arrivals or [0] * 24)
+        self.interval = base
+        self.reason = "startup"
+
+    @classmethod
+    def for_monitor(cls, name, seen_store=None):
+        history = seen_store.arrival_histogram() if seen_store is not None else None
+        return cls(arrivals=history, **POLL_SCHEDULES[name])
+
+    def busyness(self, hour=None):
+        """How this hour compares with the average hour (1.0 = average, 0 = no history)."""
+        hour = time.localtime().tm_hour if hour is None else hour
+        mean = sum(self.arrivals) / 24
+        return self.arrivals[hour] / mean if mean else 0.0
+
+    def hour_ceiling(self):
+        """Longest interval for this hour: near base when busy, quiet_ceiling only when history says quiet."""
+        if sum(self.arrivals) < MIN_HISTORY:
+            return self.ceiling
+        busy = self.busyness()
+        if busy >= 1:
+            # Burst hours hold at base, and closer to the floor the busier they are
+            return max(self.floor, self.base / busy)
+        if busy < QUIET_BUSYNESS:
+            return self.quiet_ceiling
+        return self.ceiling
+
+    def record(self, new_count=0, error=False):
+        """Update the interval after a poll and return the (jittered) delay to sleep."""
+        if error:
+            self.interval = min(self.quiet_ceiling, max(self.interval, self.base) * ERROR_FACTOR)
+            self.reason = "poll failed, backing off"
+        elif new_count:
+            self.arrivals[time.localtime().tm_hour] += new_count
+            self.interval = self.floor
+            self.reason = f"{new_count} new, tightening"
+        else:
+            cap = self.hour_ceiling()
+            # min() also pulls a long quiet-hour interval back down once a busier hour starts
+            self.interval = min(cap, max(self.interval, self.floor) * BACKOFF_FACTOR)
+            self.reason = f"empty poll, backing off (hour x{self.busyness():.1f}, cap {cap:.0f}s)"
+
+        return self.interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def describe(self):
+        return f"{self.interval:.1f}s ({self.reason})"
@@ -0,0 +1,57 @@
+# search_query.py
+# Turns the wanted cities and filters into searchJobRequest constraints, so the
+# server drops out-of-area postings instead of us paging through all of Canada.
+
+from config import USER_DETAILS, CITY_SEARCH_CENTRES, SEARCH_EQUAL_FILTERS
+
+DEFAULT_DISTANCE = 25   # km, when a postalCode region doesn't give one
+
+
+def equal_filters(filters=SEARCH_EQUAL_FILTERS):
+    return [{"key": key, "val": val} for key, val in filters.items()]
+
+
+def region_filters(region):
+    """The location part of a searchJobRequest for one region."""
+    if region.get("mapBounds"):
+        return {"postalCode": None, "distance": None, "mapBounds": region["mapBounds"]}
+    return {
+        "postalCode": region["postalCode"],
+        "distance": region.get("distance", DEFAULT_DISTANCE),
+        "mapBounds": None,
+    }
+
+
+def build_searches(regions=None, filters=SEARCH_EQUAL_FILTERS):
+    """[(name, filters)] with one entry per region, or a single unfiltered-location search if there are none."""
+    equal = equal_filters(filters)
+    if not regions:
+        return [("Canada", {"equalFilters": equal, "postalCode": None, "distance": None, "mapBounds": None})]
+    return [(name, {"equalFilters": equal, **region_filters(region)}) for name, region in regions.items()]
+
+
+def plan_searches(registry=None, centres=CITY_SEARCH_CENTRES):
+    """Searches covering preferred_cities and every subscriber city.
+
+    Cities with no centre, and subscribers with no cities at all, can only be served by
+    the Canada-wide search, so it is added alongside the regions when any exist.
+    """
+    cities = [c.lower() for c in USER_DETAILS["preferred_cities"]]
+    anywhere = False
+    if registry is not None:
+        cities += [c for sub in registry.subscribers for c in sub.cities]
+        anywhere = any(not sub.cities for sub in registry.subscribers)
+
+    regions, missing = {}, []
+    for city in dict.fromkeys(cities):
+        if city in centres:
+            regions[city] = centres[city]
+        else:
+            missing.append(city)
+    if missing:
+        print(f"⚠️ No search centre for {', '.join(missing)}: searching all of Canada for them. "
+              f"Add them to CITY_SEARCH_CENTRES in config.py to narrow the scan.")
+    searches = build_searches(regions)
+    if regions and (missing or anywhere):
+        searches += build_searches()
+    return searches
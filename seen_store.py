@@ -0,0 +1,160 @@
+# seen_store.py
+
+import os
+import sqlite3
+import time
+from config import SEEN_STORE_PATH, SEEN_TTL_HOURS
+
+
+class MemorySeenStore:
+    """Plain dict store: job_id -> last time the posting was listed. Lost on restart."""
+
+    def __init__(self, namespace="default", ttl_hours=SEEN_TTL_HOURS):
+        self.namespace = namespace
+        self.ttl = ttl_hours * 3600
+        self._last_seen = {}
+        # New postings per local hour of day; survives TTL eviction (feeds the poll scheduler)
+        self._arrivals = [0] * 24
+        # job_id -> bitmask of subscriber ids already alerted (see subscribers.py)
+        self._notified = {}
+
+    def __contains__(self, job_id):
+        return job_id in self._last_seen
+
+    def __len__(self):
+        return len(self._last_seen)
+
+    def add(self, job_id, arrival=True):
+        """Remember job_id; `arrival=False` keeps it out of the histogram (e.g. the cold-start backlog)."""
+        now = time.time()
+        if arrival and job_id not in self._last_seen:
+            self._arrivals[time.localtime(now).tm_hour] += 1
+        self._last_seen[job_id] = now
+
+    def arrival_histogram(self):
+        return list(self._arrivals)
+
+    def notified(self, job_id) -> int:
+        return self._notified.get(job_id, 0)
+
+    def mark_notified(self, job_id, mask):
+        """Record subscriber bits as alerted for a job already in the store."""
+        if job_id in self._last_seen and mask:
+            self._notified[job_id] = self._notified.get(job_id, 0) | mask
+
+    def touch(self, job_ids):
+        # Refresh postings that are still listed so TTL only hits ones that disappeared
+        now = time.time()
+        for job_id in job_ids:
+            if job_id in self._last_seen:
+                self._last_seen[job_id] = now
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl
+        expired = [jid for jid, ts in self._last_seen.items() if ts < cutoff]
+        for job_id in expired:
+            del self._last_seen[job_id]
+            self._notified.pop(job_id, None)
+        return len(expired)
+
+    def close(self):
+        pass
+
+
+class SqliteSeenStore(MemorySeenStore):
+    """Memory store mirrored to SQLite (WAL) so a restart does not re-alert on open postings."""
+
+    def __init__(self, namespace="default", ttl_hours=SEEN_TTL_HOURS, path=SEEN_STORE_PATH):
+        super().__init__(namespace, ttl_hours)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " namespace TEXT NOT NULL,"
+            " job_id TEXT NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " PRIMARY KEY (namespace, job_id)"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS arrivals ("
+            " namespace TEXT NOT NULL,"
+            " hour INTEGER NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (namespace, hour)"
+            ") WITHOUT ROWID"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(seen)")}
+        if "notified" not in columns:
+            self._db.execute("ALTER TABLE seen ADD COLUMN notified BLOB")
+        self._db.commit()
+
+        # Warm start: one scan loads the namespace; membership is served from memory
+        for job_id, last_seen, notified in self._db.execute(
+            "SELECT job_id, last_seen, notified FROM seen WHERE namespace = ?", (namespace,)
+        ):
+            self._last_seen[job_id] = last_seen
+            if notified:
+                self._notified[job_id] = int.from_bytes(notified, "little")
+        for hour, count in self._db.execute(
+            "SELECT hour, count FROM arrivals WHERE namespace = ?", (namespace,)
+        ):
+            self._arrivals[hour] = count
+        evicted = self.evict_expired()
+        print(f"🗂️ Seen store '{namespace}': {len(self)} jobs loaded, {evicted} expired.")
+
+    def add(self, job_id, arrival=True):
+        is_new = arrival and job_id not in self._last_seen
+        super().add(job_id, arrival)
+        with self._db:
+            self._db.execute(
+                "INSERT INTO seen (namespace, job_id, last_seen) VALUES (?, ?, ?)"
+                " ON CONFLICT (namespace, job_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (self.namespace, job_id, self._last_seen[job_id])
+            )
+            if is_new:
+                hour = time.localtime(self._last_seen[job_id]).tm_hour
+                self._db.execute(
+                    "INSERT OR REPLACE INTO arrivals VALUES (?, ?, ?)",
+                    (self.namespace, hour, self._arrivals[hour])
+                )
+
+    def touch(self, job_ids):
+        super().touch(job_ids)
+        with self._db:
+            self._db.executemany(
+                "UPDATE seen SET last_seen = ? WHERE namespace = ? AND job_id = ?",
+                [(self._last_seen[jid], self.namespace, jid) for jid in job_ids if jid in self._last_seen]
+            )
+
+    def mark_notified(self, job_id, mask):
+        super().mark_notified(job_id, mask)
+        mask = self._notified.get(job_id)
+        if mask:
+            # Python int bitset -> little-endian bytes: 1 bit per subscriber
+            with self._db:
+                self._db.execute(
+                    "UPDATE seen SET notified = ? WHERE namespace = ? AND job_id = ?",
+                    (mask.to_bytes((mask.bit_length() + 7) // 8, "little"), self.namespace, job_id)
+                )
+
+    def evict_expired(self) -> int:
+        evicted = super().evict_expired()
+        if evicted:
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM seen WHERE namespace = ? AND last_seen < ?",
+                    (self.namespace, time.time() - self.ttl)
+                )
+        return evicted
+
+    def close(self):
+        self._db.close()
+
+
+def open_seen_store(namespace, backend=None):
+    backend = backend or os.getenv("SEEN_STORE_BACKEND", "sqlite")
+    if backend == "memory":
+        return MemorySeenStore(namespace)
+    return SqliteSeenStore(namespace)
@@ -0,0 +1,173 @@
+# session.py
+
+import asyncio
+import os
+import signal
+import time
+from contextlib import AsyncExitStack
+import metrics
+from config import (
+    SESSION_MAX_NAVIGATIONS, SESSION_JS_HEAP_MB, SESSION_BROWSER_RSS_MB,
+    SESSION_SAMPLE_EVERY, SESSION_CONTEXT_MAX_PAGES,
+)
+
+_PAGE_SIZE_MB = os.sysconf("SC_PAGE_SIZE") / 1024 / 1024 if hasattr(os, "sysconf") else 0
+
+
+# --- Memory probes (Linux /proc; None elsewhere) ---
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE_MB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def python_rss_mb():
+    return _rss_mb(os.getpid())
+
+
+def browser_rss_mb():
+    """Summed RSS of every process below this one: the Playwright driver, Chromium and its renderers."""
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return None
+    children = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # ppid is the 2nd field after the ")" that closes the command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+
+    total, stack = 0.0, list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total += _rss_mb(pid) or 0
+        stack.extend(children.get(pid, []))
+    return total
+
+
+async def js_heap_mb(page):
+    try:
+        used = await page.evaluate("performance.memory ? performance.memory.usedJSHeapSize : null")
+    except Exception:
+        return None
+    return used / 1024 / 1024 if used is not None else None
+
+
+class MonitorSession:
+    """The long-lived scan page, recycled before it can grow until the OOM killer steps in.
+
+    The page is replaced after `max_navigations` polls or once its JS heap passes `heap_mb`;
+    the whole context (and its renderer processes) once Chromium passes `rss_mb` or after
+    `context_max_pages` page recycles.
+    """
+
+    def __init__(self, pool, profile="scan", max_navigations=SESSION_MAX_NAVIGATIONS,
+                 heap_mb=SESSION_JS_HEAP_MB, rss_mb=SESSION_BROWSER_RSS_MB,
+                 sample_every=SESSION_SAMPLE_EVERY, context_max_pages=SESSION_CONTEXT_MAX_PAGES):
+        self.pool = pool
+        self.profile = profile
+        self.max_navigations = max_navigations
+        self.heap_mb = heap_mb
+        self.rss_mb = rss_mb
+        self.sample_every = sample_every
+        self.context_max_pages = context_max_pages
+
+        self.context = None
+        self.page = None
+        self.navigations = 0
+        self.pages_used = 0
+        self._lease = None
+
+    async def __aenter__(self):
+        await self._open_context()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._close_context()
+
+    async def _open_context(self):
+        self._lease = AsyncExitStack()
+        self.context = await self._lease.enter_async_context(self.pool.lease(self.profile))
+        self.pages_used = 0
+        await self._open_page()
+
+    async def _close_context(self, retire=False):
+        if retire:
+            # Have the pool replace it rather than hand the bloated context to someone else
+            self.pool.retire(self.context)
+        await self._lease.aclose()
+        self.context = self.page = self._lease = None
+
+    async def _open_page(self):
+        self.page = await self.context.new_page()
+        self.navigations = 0
+        self.pages_used += 1
+
+    async def sample(self):
+        heap = await js_heap_mb(self.page)
+        py, browser = python_rss_mb(), browser_rss_mb()
+        for name, value in (("js_heap", heap), ("python", py), ("browser", browser)):
+            if value is not None:
+                metrics.MEMORY_MB.set(name, round(value, 1))
+        return heap, browser, py
+
+    async def checkpoint(self):
+        """Call after each poll: counts the navigation and recycles when a threshold is crossed."""
+        self.navigations += 1
+        if self.page.is_closed():
+            return await self.recycle("page", "page crashed or closed")
+        if self.navigations >= self.max_navigations:
+            kind = "context" if self.pages_used >= self.context_max_pages else "page"
+            return await self.recycle(kind, f"{self.navigations} navigations")
+        if self.navigations % self.sample_every:
+            return
+
+        heap, browser, _ = await self.sample()
+        if browser is not None and browser >= self.rss_mb:
+            await self.recycle("context", f"Chromium RSS {browser:.0f} MB >= {self.rss_mb} MB")
+        elif heap is not None and heap >= self.heap_mb:
+            await self.recycle("page", f"JS heap {heap:.0f} MB >= {self.heap_mb} MB")
+
+    async def recycle(self, kind, reason):
+        before = browser_rss_mb()
+        start = time.perf_counter()
+        try:
+            await self.page.close()
+        except Exception:
+            pass
+        if kind == "context":
+            await self._close_context(retire=True)
+            await self._open_context()
+        else:
+            await self._open_page()
+        elapsed = time.perf_counter() - start
+
+        metrics.observe(f"session_recycle_{kind}", elapsed)
+        metrics.inc(f"session_recycle_{kind}")
+        after = browser_rss_mb()
+        freed = f", Chromium {before:.0f} -> {after:.0f} MB" if before is not None and after is not None else ""
+        print(f"♻️ Recycled scan {kind} ({reason}) in {elapsed * 1000:.0f}ms{freed}")
+
+
+def stop_on_signals():
+    """An event set by SIGINT/SIGTERM, so the caller can finish its iteration and clean up."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def handle(sig):
+        print(f"🛑 Received {sig.name}, shutting down...")
+        stop.set()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, handle, sig)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C still arrives as KeyboardInterrupt
+            pass
+    return stop
@@ -0,0 +1,109 @@
+# subscribers.py
+
+import json
+import os
+import re
+from config import SUBSCRIBERS_PATH
+
+_PAY_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def pay_amount(text):
+    """'$18.10' -> 18.1; None when there is no number."""
+    match = _PAY_RE.search(text.replace(",", "")) if text else None
+    return float(match.group()) if match else None
+
+
+class Subscriber:
+    __slots__ = ("id", "name", "emails", "cities", "pay_floor", "employment_types", "channel")
+
+    def __init__(self, id, name, emails, cities=(), pay_floor=None, employment_types=(), channel="email"):
+        self.id = id                     # stable: it is the subscriber's bit in the dedupe mask
+        self.name = name
+        self.emails = list(emails)
+        self.cities = [c.lower() for c in cities]
+        self.pay_floor = pay_floor
+        self.employment_types = {t.lower() for t in employment_types}
+        self.channel = channel
+
+    @property
+    def bit(self):
+        return 1 << self.id
+
+    def accepts(self, job):
+        if self.pay_floor is not None:
+            pay = pay_amount(job.pay_min or job.pay_max)
+            if pay is None or pay < self.pay_floor:
+                return False
+        if self.employment_types and (job.employment_type or "").lower() not in self.employment_types:
+            return False
+        return True
+
+
+class SubscriberRegistry:
+    """Location -> subscribers inverted index, so matching a job costs O(matches), not O(subscribers)."""
+
+    def __init__(self, subscribers):
+        self.subscribers = list(subscribers)
+        self._by_city = {}
+        self._anywhere = []    # subscribers with no city filter
+        for sub in self.subscribers:
+            if not sub.cities:
+                self._anywhere.append(sub)
+            for city in sub.cities:
+                self._by_city.setdefault(city, []).append(sub)
+
+        # A lookahead match consumes nothing, so "thomas" is still found inside "st thomas";
+        # at each position it yields the longest city, and _prefixes adds the shorter ones there
+        cities = sorted(self._by_city, key=len, reverse=True)
+        self._pattern = re.compile("(?=(%s))" % "|".join(re.escape(c) for c in cities)) if cities else None
+        self._prefixes = {c: [p for p in cities if p != c and c.startswith(p)] for c in cities}
+        self._cities_in = {}   # location -> matched city keys, cached per location string
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def _cities_for(self, location):
+        hit = self._cities_in.get(location)
+        if hit is None:
+            hit = ()
+            if self._pattern is not None:
+                found = set()
+                for m in self._pattern.finditer(location.lower()):
+                    found.add(m.group(1))
+                    found.update(self._prefixes[m.group(1)])
+                hit = tuple(found)
+            self._cities_in[location] = hit
+        return hit
+
+    def match(self, job):
+        """Subscribers whose cities, pay floor and employment type all accept `job`."""
+        matched = {}
+        for city in self._cities_for(job.location):
+            for sub in self._by_city[city]:
+                matched[sub.id] = sub
+        for sub in self._anywhere:
+            matched[sub.id] = sub
+        return [sub for sub in matched.values() if sub.accepts(job)]
+
+
+def load_registry(default_emails, path=SUBSCRIBERS_PATH):
+    """Read subscribers from JSON, or fall back to one catch-all subscriber for RECEIVER_EMAIL."""
+    if path and os.path.exists(path):
+        with open(path) as f:
+            entries = json.load(f)
+        # The id is the subscriber's dedupe bit: a shared or negative id would merge or break alerts
+        ids = set()
+        for entry in entries:
+            sub_id = entry.get("id")
+            if not isinstance(sub_id, int) or isinstance(sub_id, bool) or sub_id < 0:
+                raise ValueError(f"{path}: subscriber {entry.get('name')!r} needs a non-negative integer id, got {sub_id!r}")
+            if sub_id in ids:
+                raise ValueError(f"{path}: duplicate subscriber id {sub_id} ({entry.get('name')!r})")
+            ids.add(sub_id)
+        registry = SubscriberRegistry(Subscriber(**entry) for entry in entries)
+        print(f"👥 Loaded {len(registry)} subscribers from {path}.")
+        return registry
+
+    emails = [email.strip() for email in (default_emails or "").split(",") if email.strip()]
+    return SubscriberRegistry([Subscriber(0, "default", emails)])
@@ -2,7 +2,13 @@ import asyncio
 import logging
 import time
 from apply import apply_to_job
-from notifier import send_email
+from job_record import Job
+from browser_pool import get_pool, close_pool
+from persistence import close_writer
+from utils import format_route_stats
+from readiness import format_wait_stats
+import metrics
+from notifier import send_email, flush_emails
 from dotenv import load_dotenv
 import os
 
@@ -22,29 +28,40 @@ if not SENDER_EMAIL or not SENDER_PASS:
     logger.error("❌ SENDER_EMAIL or SENDER_PASS not set")
     exit(1)
 
-test_job = {
-    "job_id": "TEST123",
-    "title": "Amazon Warehouse Associate",
-    "location": "Cambridge, ON",
-    "link": "https://hiring.amazon.ca/search/warehouse-jobs#/"
-}
+test_job = Job(
+    job_id="TEST123",
+    title="Amazon Warehouse Associate",
+    location="Cambridge, ON",
+    link="https://hiring.amazon.ca/search/warehouse-jobs#/"
+)
 
 def test_send_email():
     try:
         logger.info("🚀 Attempting to send test email...")
         send_email("✅ Test Subject", "This is a test body message.")
+        flush_emails(timeout=30)
         logger.info("✅ Test email sent!")
     except Exception as e:
         logger.error(f"❌ Email failed: {e}", exc_info=True)
 
 async def main():
     try:
-        logger.info(f"🚀 Applying to {test_job['title']}")
+        warm_start = time.time()
+        pool = await get_pool()
+        logger.info(f"🌐 Browser pool warmed in {time.time()-warm_start:.2f}s")
+
+        logger.info(f"🚀 Applying to {test_job.title}")
         start_time = time.time()
-        await apply_to_job(test_job)
+        await apply_to_job(test_job, pool)
         logger.info(f"✅ Application completed in {time.time()-start_time:.2f}s")
+        logger.info(f"🚦 Network: {format_route_stats()}")
+        logger.info(f"⏱️ Waits: {format_wait_stats()}")
+        logger.info(f"📈 Stages: {metrics.snapshot()['stages']}")
     except Exception as e:
         logger.error(f"❌ Application failed: {e}", exc_info=True)
+    finally:
+        await close_pool()
+        await close_writer()
 
 if __name__ == "__main__":
     logger.info("=== Starting Tests ===")
@@ -1,6 +1,8 @@
 import asyncio
+import os
 import random
-from playwright.async_api import async_playwright, Page, BrowserContext
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, Browser, Page, BrowserContext
 from config import USER_DETAILS
 
 # Optional: List of user agents for rotating
@@ -18,8 +20,86 @@ PROXY_CONFIG = {
     "password": "your-proxy-password"
 }
 
+# --- Network profiles: which resource types each kind of page actually needs ---
+# None means "allow everything". Anything not listed is aborted before download.
+NETWORK_PROFILES = {
+    "scan": {"document", "xhr", "fetch", "script"},
+    "apply": {"document", "xhr", "fetch", "script", "stylesheet"},
+    "full": None,
+}
+
+# Third-party trackers the bot never needs, blocked under every restricted profile
+ANALYTICS_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "nr-data.net",
+    "newrelic.com",
+    "amplitude.com",
+    "segment.io",
+)
+
+# profile -> {"allowed": requests, "allowed_bytes": bytes, "blocked": requests}
+ROUTE_STATS = {}
+
+_context_profiles = {}
+
+
+def _profile_stats(profile):
+    return ROUTE_STATS.setdefault(profile, {"allowed": 0, "allowed_bytes": 0, "blocked": 0})
+
+
+def _is_analytics(url):
+    host = urlparse(url).hostname or ""
+    return host.endswith(ANALYTICS_HOSTS)
+
+
+async def _route_request(context, route):
+    profile = _context_profiles.get(context, "full")
+    allowed = NETWORK_PROFILES.get(profile)
+    request = route.request
+
+    if allowed is not None and (request.resource_type not in allowed or _is_analytics(request.url)):
+        _profile_stats(profile)["blocked"] += 1
+        await route.abort()
+        return
+    await route.continue_()
+
+
+async def _count_response(context, response):
+    stats = _profile_stats(_context_profiles.get(context, "full"))
+    stats["allowed"] += 1
+    # content-length is missing on chunked and compressed responses; sizes() has the real body size
+    try:
+        size = (await response.request.sizes())["responseBodySize"]
+    except Exception:
+        # The page or context closed before the body finished
+        size = int(response.headers.get("content-length") or 0)
+    stats["allowed_bytes"] += size
+
+
+async def set_network_profile(context: BrowserContext, profile: str):
+    """Route the context's requests through a named profile. Switching later is free."""
+    if profile not in NETWORK_PROFILES:
+        raise ValueError(f"Unknown network profile: {profile}")
+    if context not in _context_profiles:
+        await context.route("**/*", lambda route: _route_request(context, route))
+        context.on("response", lambda response: _count_response(context, response))
+        context.on("close", lambda _: _context_profiles.pop(context, None))
+    _context_profiles[context] = profile
+
+
+def format_route_stats():
+    return ", ".join(
+        f"{profile}: {s['allowed']} allowed ({s['allowed_bytes'] / 1024:.0f} KB), {s['blocked']} blocked"
+        for profile, s in ROUTE_STATS.items()
+    ) or "no requests routed"
+
+
 # --- Launch browser with stealth options ---
-async def get_browser(headless=True) -> tuple:
+async def launch_browser(headless=True) -> tuple:
     playwright = await async_playwright().start()
 
     launch_args = {
@@ -30,8 +110,12 @@ async def get_browser(headless=True) -> tuple:
         launch_args["proxy"] = PROXY_CONFIG
 
     browser = await playwright.chromium.launch(**launch_args)
+    return playwright, browser
+
 
-    context = await browser.new_context(
+# --- New context with the stealth fingerprint ---
+async def new_stealth_context(browser: Browser) -> BrowserContext:
+    return await browser.new_context(
         user_agent=random.choice(USER_AGENTS),
         viewport={"width": 1280, "height": 800},
         java_script_enabled=True,
@@ -40,14 +124,12 @@ async def get_browser(headless=True) -> tuple:
         timezone_id="America/Toronto"
     )
 
-    return browser, context
-
 
 # --- Simulate human-like typing ---
 async def human_type(page: Page, selector: str, text: str, min_delay=50, max_delay=150):
-    for char in text:
-        await page.fill(selector, await page.input_value(selector) + char)
-        await asyncio.sleep(random.uniform(min_delay / 1000, max_delay / 1000))
+    # Real key events in one call; re-filling the whole value per character was quadratic
+    delay = random.uniform(min_delay, max_delay) * HUMAN_DELAY_SCALE
+    await page.locator(selector).press_sequentially(text, delay=delay)
 
 
 # --- Login Function (modify based on actual login flow) ---
@@ -67,23 +149,9 @@ async def login_amazon(page: Page, email: str, password: str):
     print("🔐 Logged in successfully.")
 
 
-# --- Reusable function to fill form fields safely ---
-async def safe_fill(page: Page, selector: str, value: str):
-    try:
-        await page.fill(selector, value)
-    except Exception:
-        print(f"⚠️ Could not fill selector: {selector}")
-
-
-# --- Simulate resume upload ---
-async def upload_resume(page: Page, resume_path: str = "resume.pdf"):
-    try:
-        await page.set_input_files('input[type="file"]', resume_path)
-        print("📎 Resume uploaded.")
-    except Exception:
-        print("⚠️ Resume upload field not found.")
-
-
 # --- Reusable delay ---
+# Scales every human-like pause; the offline benchmark sets 0 to time the flow itself
+HUMAN_DELAY_SCALE = float(os.getenv("HUMAN_DELAY_SCALE", "1"))
+
 async def wait_random(min_sec=1, max_sec=3):
-    await asyncio.sleep(random.uniform(min_sec, max_sec))
+    await asyncio.sleep(random.uniform(min_sec, max_sec) * HUMAN_DELAY_SCALE)